@@ -1,30 +1,138 @@
+import os
+from urllib.parse import urlencode
+
 from flask import Flask, Blueprint, jsonify, request
-from services.country_service import CountryService
+from response_cache import ResponseCache
+from services.country_query import (
+    REGIME_MAPPING, InvalidQuery, parse_query, resolve_fields, utc_offset
+)
+from services.country_service import CountryService, SnapshotCountryService
+from services.country_stats import parse_stats_query
+
+# COUNTRIES_SNAPSHOT=1 answers reads from an in-memory columnar snapshot.
+SERVE_FROM_SNAPSHOT = os.environ.get('COUNTRIES_SNAPSHOT') == '1'
 
-country_service = CountryService()
+country_service = (
+    SnapshotCountryService() if SERVE_FROM_SNAPSHOT else CountryService())
+response_cache = ResponseCache()
 app = Flask(__name__)
+app.config.setdefault('CACHE_MAX_AGE', 60)
+app.config.setdefault('MAX_PAGE_SIZE', 250)
+app.config.setdefault('MAX_BATCH_QUERIES', 20)
+app.config.setdefault('MAX_GRAPH_DEPTH', 10)
 
 api_bp = Blueprint('api', __name__, url_prefix='/api/countries')
 
 
+class CountryNotFound(LookupError):
+    pass
+
+
+@api_bp.errorhandler(InvalidQuery)
+def invalid_query(error):
+    return jsonify({"error": str(error)}), 400
+
+
+@api_bp.errorhandler(CountryNotFound)
+def country_not_found(error):
+    return jsonify({"error": "Country not found."}), 404
+
+
+def cached_json(producer, headers_for=None):
+    return response_cache.json_response(
+        country_service.dataset_version(),
+        producer,
+        app.config['CACHE_MAX_AGE'],
+        headers_for
+    )
+
+
+def requested_fields():
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return tuple(f.strip() for f in fields.split(',') if f.strip())
+
+
+def checked_limit(limit):
+    max_page_size = app.config['MAX_PAGE_SIZE']
+    if limit is None or not 1 <= limit <= max_page_size:
+        raise InvalidQuery(
+            f"Limit must be an integer between 1 and {max_page_size}.")
+    return limit
+
+
+def limit_arg(default):
+    limit = request.args.get('limit')
+    if limit is None:
+        return checked_limit(default)
+    return checked_limit(int(limit) if limit.isdigit() else None)
+
+
+def page_args():
+    after = request.args.get('after')
+    if after is not None and not after.lstrip('-').isdigit():
+        raise InvalidQuery("After must be a country id.")
+
+    return {
+        'fields': requested_fields(),
+        'after': int(after) if after is not None else None,
+        'limit': limit_arg(app.config['MAX_PAGE_SIZE'])
+    }
+
+
+def next_page_link(limit):
+    def headers_for(countries):
+        if len(countries) < limit:
+            return {}
+        args = {**request.args.to_dict(), 'after': countries[-1]['id'],
+                'limit': limit}
+        return {'Link': f'<{request.path}?{urlencode(args)}>; rel="next"'}
+
+    return headers_for
+
+
+def paginated_json(method, *args):
+    page = page_args()
+    return cached_json(
+        lambda: method(*args, **page),
+        next_page_link(page['limit'])
+    )
+
+
 @api_bp.route('/', methods=['GET'])
 def get_all_countries():
-    countries = country_service.get_all_countries()
-    return jsonify(countries), 200
+    return paginated_json(country_service.get_all_countries)
 
 
 @api_bp.route('/top-population/<int:n>', methods=['GET'])
 @api_bp.route('/top-population', methods=['GET'])
 def top_countries_by_population(n=10):
-    countries = country_service.get_top_by_population(n)
-    return jsonify(countries), 200
+    n, fields = checked_limit(n), requested_fields()
+    return cached_json(
+        lambda: country_service.get_top_by_population(n, fields))
 
 
 @api_bp.route('/top-density/<int:n>', methods=['GET'])
 @api_bp.route('/top-density', methods=['GET'])
 def top_countries_by_density(n=10):
-    countries = country_service.get_top_by_density(n)
-    return jsonify(countries), 200
+    n, fields = checked_limit(n), requested_fields()
+    return cached_json(lambda: country_service.get_top_by_density(n, fields))
+
+
+@api_bp.route('/top-area/<int:n>', methods=['GET'])
+@api_bp.route('/top-area', methods=['GET'])
+def top_countries_by_area(n=10):
+    n, fields = checked_limit(n), requested_fields()
+    return cached_json(lambda: country_service.get_top_by_area(n, fields))
+
+
+@api_bp.route('/rank/<path:name>', methods=['GET'])
+def country_rank(name):
+    rank = country_service.get_rank(name)
+    if rank is None:
+        return jsonify({"error": "Country not found."}), 404
+    return cached_json(lambda: rank)
 
 
 @api_bp.route('/speaking', methods=['GET'])
@@ -33,19 +141,25 @@ def countries_speaking_language():
     if not language:
         return jsonify({"error": "Language parameter is required."}), 400
 
-    countries = country_service.get_by_language(language)
-    return jsonify(countries), 200
+    return paginated_json(country_service.get_by_language, language)
 
 
 @api_bp.route('/timezone', methods=['GET'])
 def countries_by_timezone():
     timezone = request.args.get('timezone')
+    low, high = request.args.get('from'), request.args.get('to')
 
-    if not timezone:
-        return jsonify({"error": "Timezone parameter is required."}), 400
+    if timezone:
+        low = high = utc_offset('timezone', timezone)
+    elif low or high:
+        low = utc_offset('from', low) if low else None
+        high = utc_offset('to', high) if high else None
+    else:
+        return jsonify({
+            "error": "Timezone parameter, or from and/or to, is required."
+        }), 400
 
-    countries = country_service.get_by_timezone(timezone)
-    return jsonify(countries), 200
+    return paginated_json(country_service.get_by_utc_offset, low, high)
 
 
 @api_bp.route('/political', methods=['GET'])
@@ -54,25 +168,130 @@ def countries_by_regime():
     if not regime:
         return jsonify({"error": "Regime parameter is required."}), 400
 
-    regime_mapping = {
-        "Presidential Republic": "presidential republic",
-        "Parliamentary Republic": "parliamentary republic",
-        "Constitutional Monarchy": "constitutional monarchy",
-        "Absolute Monarchy": "absolute monarchy",
-        "Theocracy": "theocratic",
-        "Socialist Republic": "socialist republic",
-        "Federal Republic": "federal",
-        "Military Junta": "military junta",
-        "Authoritarian State": "authoritarian",
-        "Transitional Government": "transitional government"
-    }
-
-    if regime not in regime_mapping:
+    if regime not in REGIME_MAPPING:
         return jsonify({"error": "Invalid regime type."}), 400
 
-    regime_query = regime_mapping[regime]
-    countries = country_service.get_by_regime(regime_query)
-    return jsonify(countries), 200
+    return paginated_json(country_service.get_by_regime, regime)
+
+
+@api_bp.route('/query', methods=['GET'])
+def query_countries():
+    country_query = parse_query(
+        request.args.to_dict(), app.config['MAX_PAGE_SIZE'])
+    return cached_json(lambda: country_service.query(country_query))
+
+
+@api_bp.route('/search', methods=['GET'])
+def search_countries():
+    q = request.args.get('q')
+    if not q:
+        return jsonify({"error": "Q parameter is required."}), 400
+
+    limit = limit_arg(10)
+    fields = requested_fields()
+    return cached_json(lambda: country_service.search(q, limit, fields))
+
+
+@api_bp.route('/stats', methods=['GET'])
+def country_stats():
+    stats_query = parse_stats_query(request.args.to_dict())
+    return cached_json(lambda: country_service.get_stats(stats_query))
+
+
+@api_bp.route('/name/<path:name>', methods=['GET'])
+def country_by_name(name):
+    fields = requested_fields()
+    country = country_service.get_by_name(name, fields)
+    if country is None:
+        return jsonify({"error": "Country not found."}), 404
+    return cached_json(lambda: country)
+
+
+@api_bp.route('/batch', methods=['POST'])
+def batch():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "A JSON object body is required."}), 400
+
+    names = payload.get('names', [])
+    queries = payload.get('queries', [])
+    fields = payload.get('fields')
+    if (not isinstance(names, list)
+            or not all(isinstance(name, str) for name in names)):
+        return jsonify({"error": "Names must be a list of strings."}), 400
+    if (not isinstance(queries, list)
+            or not all(isinstance(query, dict) for query in queries)):
+        return jsonify({"error": "Queries must be a list of objects."}), 400
+    if fields is not None and (
+            not isinstance(fields, list)
+            or not all(isinstance(f, str) for f in fields)):
+        return jsonify({"error": "Fields must be a list of strings."}), 400
+
+    if len(names) > app.config['MAX_PAGE_SIZE']:
+        return jsonify({"error": "Too many names in one batch."}), 400
+    if len(queries) > app.config['MAX_BATCH_QUERIES']:
+        return jsonify({"error": "Too many queries in one batch."}), 400
+
+    fields = tuple(fields) if fields else None
+    if fields:
+        resolve_fields(fields)
+    country_queries = [
+        parse_query(
+            {key: str(value) for key, value in query.items()},
+            app.config['MAX_PAGE_SIZE']
+        )
+        for query in queries
+    ]
+    return jsonify(country_service.batch(names, country_queries, fields)), 200
+
+
+@api_bp.route('/neighbors-count/<int:count>', methods=['GET'])
+def countries_by_neighbors_count(count):
+    fields = requested_fields()
+    return cached_json(
+        lambda: country_service.get_by_neighbors_count(count, fields))
+
+
+def graph_country_id(name):
+    country_id = country_service.resolve_country_id(name)
+    if country_id is None:
+        raise CountryNotFound(name)
+    return country_id
+
+
+@api_bp.route('/graph/degrees', methods=['GET'])
+def neighbor_degrees():
+    return cached_json(lambda: country_service.neighbor_graph().degrees())
+
+
+@api_bp.route('/graph/neighbors/<path:name>', methods=['GET'])
+def neighborhood(name):
+    max_depth = app.config['MAX_GRAPH_DEPTH']
+    depth = request.args.get('depth', '1')
+    if not depth.isdigit() or not 1 <= int(depth) <= max_depth:
+        raise InvalidQuery(f"Depth must be between 1 and {max_depth}.")
+
+    country_id = graph_country_id(name)
+    graph = country_service.neighbor_graph()
+    return cached_json(lambda: graph.neighborhood(country_id, int(depth)))
+
+
+@api_bp.route('/graph/path', methods=['GET'])
+def land_path():
+    if not request.args.get('from') or not request.args.get('to'):
+        raise InvalidQuery("From and to parameters are required.")
+    source = graph_country_id(request.args['from'])
+    target = graph_country_id(request.args['to'])
+
+    path = country_service.neighbor_graph().shortest_path(source, target)
+    if path is None:
+        return jsonify({"error": "No land path between these countries."}), 404
+    return cached_json(lambda: path)
+
+
+@api_bp.route('/graph/components', methods=['GET'])
+def land_components():
+    return cached_json(lambda: country_service.neighbor_graph().components())
 
 
 app.register_blueprint(api_bp)
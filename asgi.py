@@ -0,0 +1,72 @@
+"""ASGI entry point for the country API.
+
+The Flask app is wrapped with a2wsgi, which runs each request on a thread
+pool, so a slow client waiting on its socket never holds a worker while
+the event loop keeps serving keep-alive connections.
+
+    python asgi.py --workers 4 --threads 16
+    uvicorn asgi:application --workers 4
+
+a2wsgi and uvicorn are optional dependencies, only needed for this mode:
+
+    pip install a2wsgi uvicorn
+"""
+import argparse
+import os
+import sys
+
+MISSING_DEPENDENCIES = (
+    "ASGI mode needs the optional packages a2wsgi and uvicorn: "
+    "pip install a2wsgi uvicorn"
+)
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError as e:
+    if __name__ == '__main__':
+        sys.exit(MISSING_DEPENDENCIES)
+    raise ImportError(MISSING_DEPENDENCIES) from e
+
+from api import app
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 1
+# Request threads per worker process; read from the environment because
+# every worker process imports this module on its own.
+THREADS = int(os.environ.get('API_THREADS', '16'))
+
+application = WSGIMiddleware(app, workers=THREADS)
+
+
+def main():
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit(MISSING_DEPENDENCIES)
+
+    parser = argparse.ArgumentParser(description="Serve the country API.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="worker processes")
+    parser.add_argument('--threads', type=int, default=THREADS,
+                        help="request threads per worker process")
+    parser.add_argument('--keep-alive', type=int, default=30,
+                        help="seconds to hold an idle keep-alive connection")
+    args = parser.parse_args()
+
+    os.environ['API_THREADS'] = str(args.threads)
+    uvicorn.run(
+        'asgi:application',
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive,
+        backlog=4096,
+        access_log=False
+    )
+
+
+if __name__ == '__main__':
+    main()
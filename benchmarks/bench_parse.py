@@ -0,0 +1,58 @@
+"""CPU time of the infobox parser, before and after the single-pass rewrite.
+
+Parses each saved article with the old extractor (legacy_infobox.py) and
+the current one, checks that both return the same fields, and prints the
+CPU time per page of each.
+
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --repeat 50 saved/Romania.html
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from benchmarks import legacy_infobox
+from scrapers.country_info_scraper import parse_country_html
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def cpu_time(parse: Callable[[str], Dict], html: str, repeat: int) -> float:
+    """Mean CPU seconds of one ``parse(html)`` call."""
+    start = time.process_time()
+    for _ in range(repeat):
+        parse(html)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark infobox parsing.")
+    parser.add_argument('pages', nargs='*', type=Path,
+                        default=sorted(FIXTURES.glob('*.html')),
+                        help="saved Wikipedia article HTML files")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<16}{'KB':>8}{'old ms':>10}{'new ms':>10}{'speedup':>9}")
+    for page in args.pages:
+        html = page.read_text(encoding='utf-8')
+
+        old = legacy_infobox.parse_country_html(html)
+        new = parse_country_html(html)
+        # The old parser had no UTC offsets; every other field must match.
+        new.pop('UTC Offsets', None)
+        if old != new:
+            raise SystemExit(f"{page.name}: outputs differ\n"
+                             f"  old: {old}\n  new: {new}")
+
+        old_time = cpu_time(legacy_infobox.parse_country_html, html,
+                            args.repeat)
+        new_time = cpu_time(parse_country_html, html, args.repeat)
+        print(f"{page.stem:<16}{len(html) / 1024:>8.0f}"
+              f"{old_time * 1000:>10.1f}{new_time * 1000:>10.1f}"
+              f"{old_time / new_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Wall time of a scrape run against a local stand-in for Wikipedia.
+
+Serves the saved article pages from a local HTTP server that holds every
+response for ``--latency`` seconds, then scrapes ``--countries`` pages
+with one worker and with ``--workers`` workers. One worker takes about
+countries x latency, which is what the run costs against the real site;
+the concurrent run should approach countries x latency / workers.
+
+    python -m benchmarks.bench_scrape
+    python -m benchmarks.bench_scrape --latency 0.3 --workers 16
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from itertools import cycle, islice
+from pathlib import Path
+
+from data_operations import data_aggregator
+from scrapers.border_scraper import BorderIndex
+from scrapers.http_cache import ResponseCache
+from scrapers.http_client import HttpClient
+from scrapers.rate_limiter import HostRateLimiter
+from tests.stub_server import StubServer
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def scrape(countries, workers, parse_processes, cache_path) -> float:
+    # A new, empty response cache for every run, so each page is fetched.
+    client = HttpClient(
+        pool_size=workers,
+        rate_limiter=HostRateLimiter(1000),
+        cache=ResponseCache(cache_path)
+    )
+    border_index = BorderIndex({c['name']: [] for c in countries})
+
+    start = time.perf_counter()
+    try:
+        # The aggregator prints a line per country; keep the report readable.
+        with redirect_stdout(io.StringIO()):
+            records = list(data_aggregator.iter_aggregated_countries(
+                countries,
+                border_index=border_index,
+                workers=workers,
+                parse_processes=parse_processes,
+                client=client
+            ))
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+        client.cache.close()
+
+    failed = [r['name'] for r in records
+              if 'error' in r['additional_info']]
+    if len(records) != len(countries) or failed:
+        raise SystemExit(f"Scrape failed for: {failed}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraping.")
+    parser.add_argument('--countries', type=int, default=40)
+    parser.add_argument('--workers', type=int,
+                        default=data_aggregator.DEFAULT_WORKERS)
+    parser.add_argument('--latency', type=float, default=0.2,
+                        help="seconds the stub holds every response")
+    parser.add_argument('--parse-processes', type=int, default=0,
+                        help="0 parses on the fetch threads")
+    args = parser.parse_args()
+
+    pages = [page.read_text(encoding='utf-8')
+             for page in sorted(FIXTURES.glob('*.html'))]
+    routes = {f'/wiki/Country_{i}': page
+              for i, page in enumerate(islice(cycle(pages), args.countries))}
+
+    with StubServer(routes, latency=args.latency) as server, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        countries = [{'name': path.rsplit('/', 1)[1], 'population': '1',
+                      'country_link': server.url(path)} for path in routes]
+
+        print(f"{args.countries} pages, {args.latency * 1000:.0f} ms latency,"
+              f" at least {args.countries * args.latency:.1f} s one by one")
+        for run, workers in enumerate((1, args.workers)):
+            elapsed = scrape(countries, workers, args.parse_processes,
+                             os.path.join(cache_dir, f'run-{run}.db'))
+            print(f"{workers:>3} worker(s): {elapsed:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy import String, ForeignKey
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -12,15 +12,21 @@ class Country(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, unique=True)
-    population: Mapped[int] = mapped_column()
-    capital: Mapped[str] = mapped_column(String)
-    timezone: Mapped[str] = mapped_column(String)
-    government: Mapped[str] = mapped_column(String)
-    area: Mapped[float] = mapped_column()
-    spoken_language: Mapped[str] = mapped_column(String)
-    density: Mapped[float] = mapped_column()
+    population: Mapped[int] = mapped_column(index=True)
+    capital: Mapped[Optional[str]] = mapped_column(String)
+    timezone: Mapped[Optional[str]] = mapped_column(String)
+    government: Mapped[Optional[str]] = mapped_column(String)
+    area: Mapped[float] = mapped_column(index=True)
+    spoken_language: Mapped[Optional[str]] = mapped_column(String)
+    density: Mapped[float] = mapped_column(index=True)
 
     neighbors: Mapped[List["Neighbor"]] = relationship(
+        back_populates="country", foreign_keys="Neighbor.country_id")
+    languages: Mapped[List["CountryLanguage"]] = relationship(
+        back_populates="country")
+    utc_offsets: Mapped[List["CountryUtcOffset"]] = relationship(
+        back_populates="country")
+    regimes: Mapped[List["CountryRegime"]] = relationship(
         back_populates="country")
 
     def to_dict(self) -> dict:
@@ -49,5 +55,61 @@ class Neighbor(Base):
     country_id: Mapped[int] = mapped_column(
         ForeignKey('countries.id'), primary_key=True)
     neighbor: Mapped[str] = mapped_column(String, primary_key=True)
+    neighbor_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey('countries.id'), index=True)
+
+    country: Mapped["Country"] = relationship(
+        back_populates="neighbors", foreign_keys=[country_id])
+
+
+class CountryLanguage(Base):
+    __tablename__ = 'country_languages'
+
+    language: Mapped[str] = mapped_column(String, primary_key=True)
+    country_id: Mapped[int] = mapped_column(
+        ForeignKey('countries.id'), primary_key=True, index=True)
+
+    country: Mapped["Country"] = relationship(back_populates="languages")
+
+
+class CountryUtcOffset(Base):
+    __tablename__ = 'country_utc_offsets'
+
+    offset_minutes: Mapped[int] = mapped_column(primary_key=True)
+    country_id: Mapped[int] = mapped_column(
+        ForeignKey('countries.id'), primary_key=True, index=True)
+
+    country: Mapped["Country"] = relationship(back_populates="utc_offsets")
+
 
-    country: Mapped["Country"] = relationship(back_populates="neighbors")
+class CountryRegime(Base):
+    __tablename__ = 'country_regimes'
+
+    regime: Mapped[str] = mapped_column(String, primary_key=True)
+    country_id: Mapped[int] = mapped_column(
+        ForeignKey('countries.id'), primary_key=True, index=True)
+
+    country: Mapped["Country"] = relationship(back_populates="regimes")
+
+
+class CountryRanking(Base):
+    __tablename__ = 'country_rankings'
+
+    metric: Mapped[str] = mapped_column(String, primary_key=True)
+    rank: Mapped[int] = mapped_column(primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey('countries.id'))
+
+
+class CountryAlias(Base):
+    __tablename__ = 'country_aliases'
+
+    alias: Mapped[str] = mapped_column(String, primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey('countries.id'))
+
+
+class CountryRevision(Base):
+    __tablename__ = 'country_revisions'
+
+    country_id: Mapped[int] = mapped_column(
+        ForeignKey('countries.id'), primary_key=True)
+    revision_id: Mapped[int] = mapped_column()
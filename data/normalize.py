@@ -0,0 +1,181 @@
+import re
+import unicodedata
+from typing import Iterator, List, Optional
+
+_LIST_SEPARATORS = re.compile(r'[,;:•·/]|\band\b')
+_WORD = re.compile(r'[^\W\d_]{3,}')
+_LANGUAGE_STOPWORDS = {
+    'the', 'and', 'with', 'none', 'level', 'federal', 'other', 'language',
+    'languages', 'national', 'official', 'special', 'status', 'sign',
+    'administrative', 'indigenous', 'standard'
+}
+# Languages whose name has several words, none of which is a language.
+MULTIWORD_LANGUAGES = {
+    'cook islands māori', 'fiji hindi', 'haitian creole', 'hiri motu',
+    'seychellois creole', 'south african sign language', 'tok pisin',
+}
+_LONGEST_MULTIWORD = max(len(name.split()) for name in MULTIWORD_LANGUAGES)
+# Other spellings used by Wikipedia lists -> the name used in countries.
+COUNTRY_ALIASES = {
+    "China": "People's Republic of China",
+    "State of Palestine": "Palestine",
+    "Palestinian territories": "Palestine",
+    "Ivory Coast": "Côte d'Ivoire",
+    "Timor-Leste": "East Timor",
+    "Czechia": "Czech Republic",
+    "Swaziland": "Eswatini",
+    "Congo": "Republic of the Congo",
+    "Republic of Congo": "Republic of the Congo",
+    "DR Congo": "Democratic Republic of the Congo",
+    "Burma": "Myanmar",
+    "Macedonia": "North Macedonia",
+    "Cabo Verde": "Cape Verde",
+    "Vatican": "Vatican City",
+    "Holy See": "Vatican City",
+}
+
+# Regime tag -> phrase that marks it in an infobox government string.
+REGIME_MAPPING = {
+    "Presidential Republic": "presidential republic",
+    "Parliamentary Republic": "parliamentary republic",
+    "Constitutional Monarchy": "constitutional monarchy",
+    "Absolute Monarchy": "absolute monarchy",
+    "Theocracy": "theocratic",
+    "Socialist Republic": "socialist republic",
+    "Federal Republic": "federal",
+    "Military Junta": "military junta",
+    "Authoritarian State": "authoritarian",
+    "Transitional Government": "transitional government"
+}
+
+_HOURS = r'\s*(\d{1,2})(?:([:.])(\d{1,2}))?'
+_UTC_OFFSET = re.compile(r'([+\-±])' + _HOURS)
+# 'UTC−4 to −12': the second sign may be left out, meaning the first.
+_UTC_RANGE = re.compile(r'([+\-±])' + _HOURS + r'\s*TO\s*([+\-±])?' + _HOURS)
+_BARE_UTC = re.compile(r'UTC(?!\s*[+\-±]\s*\d)')
+
+
+def _normalize_text(text: str) -> str:
+    text = unicodedata.normalize('NFKC', text).replace('⁠', '')
+    for dash in ('−', '–', '—'):
+        text = text.replace(dash, '-')
+    return text
+
+
+def normalize_country_name(name: str) -> str:
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'\(.*?\)|\[.*?\]', '', text).lower()
+    text = re.sub(r"[^\w\s]", ' ', text)
+    text = re.sub(r'^\s*the\s+', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def normalize_language(language: str) -> str:
+    return re.sub(r'\s+', ' ', _normalize_text(language)).strip().lower()
+
+
+def _language_keys(words: List[str]) -> Iterator[str]:
+    """Languages in one list entry, which may run several together."""
+    i = 0
+    while i < len(words):
+        for length in range(_LONGEST_MULTIWORD, 1, -1):
+            name = ' '.join(words[i:i + length])
+            if name in MULTIWORD_LANGUAGES:
+                yield name
+                i += length
+                break
+        else:
+            word = words[i]
+            if words[i + 1:i + 3] == ['sign', 'language'] and \
+                    _WORD.fullmatch(word):
+                yield f'{word} sign language'
+                i += 3
+                continue
+            if _WORD.fullmatch(word) and word not in _LANGUAGE_STOPWORDS:
+                yield word
+            i += 1
+
+
+def split_languages(text: Optional[str]) -> List[str]:
+    """Split an infobox language string into language keys.
+
+    The infobox often runs several languages together without a separator
+    ("Spanish Quechua Aymara"), so each entry is read word by word. Words
+    of a known multi-word name such as "Tok Pisin" stay together, and
+    counts, single letters and words like "languages" are dropped.
+    """
+    if not text:
+        return []
+
+    keys = []
+    for part in _LIST_SEPARATORS.split(_normalize_text(text)):
+        keys.extend(_language_keys(normalize_language(part).split()))
+    return list(dict.fromkeys(keys))
+
+
+def classify_regimes(government: Optional[str]) -> List[str]:
+    """The REGIME_MAPPING tags whose phrase appears in ``government``."""
+    if not government:
+        return []
+    text = _normalize_text(government).lower()
+    return [tag for tag, phrase in REGIME_MAPPING.items() if phrase in text]
+
+
+def _offset_minutes(sign: str, hours: str, separator: str,
+                    fraction: str) -> int:
+    minutes = 0
+    if fraction:
+        minutes = (int(fraction) if separator == ':'
+                   else round(float(f"0.{fraction}") * 60))
+    minutes += int(hours) * 60
+    return -minutes if sign == '-' else minutes
+
+
+def offset_label(minutes: int) -> str:
+    """'UTC+1', 'UTC-3:30' or plain 'UTC' for an offset in minutes."""
+    if minutes == 0:
+        return 'UTC'
+    hours, rest = divmod(abs(minutes), 60)
+    label = f"UTC{'-' if minutes < 0 else '+'}{hours}"
+    if rest:
+        label += f":{rest:02d}"
+    return label
+
+
+def parse_utc_offsets(text: Optional[str]) -> List[int]:
+    """UTC offsets in minutes named in an infobox timezone string.
+
+    'UTC+01:00' and 'UTC+1' are both 60, 'UTC+05:30' is 330 and plain 'UTC'
+    is 0. A range such as 'UTC+7 to +9' covers each whole hour from one end
+    to the other. The result is sorted and has no duplicates.
+    """
+    if not text:
+        return []
+
+    text = _normalize_text(text).upper()
+    offsets = {_offset_minutes(*match.groups())
+               for match in _UTC_OFFSET.finditer(text)}
+    for match in _UTC_RANGE.finditer(text):
+        groups = match.groups()
+        first = _offset_minutes(*groups[:4])
+        last = _offset_minutes(groups[4] or groups[0], *groups[5:])
+        low, high = min(first, last), max(first, last)
+        offsets.update((low, high))
+        # Every whole hour in between; the infobox only names the ends.
+        offsets.update(range(-(-low // 60) * 60, high + 1, 60))
+    if _BARE_UTC.search(text):
+        offsets.add(0)
+    return sorted(offsets)
+
+
+def parse_utc_offset(value: str) -> Optional[int]:
+    """Read a single offset such as 'UTC+2', '+5:30' or 'UTC' from a query.
+
+    Returns None if ``value`` does not name exactly one offset.
+    """
+    # A '+' in a query string arrives as a space, so 'UTC 2' and '2' both
+    # mean 'UTC+2'.
+    value = re.sub(r'^\s*(UTC)?\s*(?=\d)', r'\1+', value, flags=re.IGNORECASE)
+    offsets = parse_utc_offsets(value)
+    return offsets[0] if len(offsets) == 1 else None
@@ -1,63 +1,155 @@
-import json
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from scrapers.border_scraper import get_neighbors_for_country
+from data_operations.json_lines import iter_records, write_records
+from scrapers.border_scraper import BorderIndex, load_border_index
 from scrapers.country_info_scraper import CountryScraper
+from scrapers.http_cache import ResponseCache
+from scrapers.http_client import HttpClient
+from scrapers.rate_limiter import HostRateLimiter
+from scrapers.scrape_pipeline import scrape_pipelined
 
+DEFAULT_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+# 0 parses inline on the fetcher threads, None uses one process per core.
+DEFAULT_PARSE_PROCESSES = None
 
-def process_countries(file_path: str) -> List[Dict[str, Any]]:
+
+def load_country_links(file_path: str) -> List[Dict[str, Any]]:
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            countries_data = json.load(file)
+        countries_data = list(iter_records(file_path))
     except Exception as e:
         print(f"Failed to load JSON file: {e}")
         return []
 
-    scraper = CountryScraper()
-    processed_data = []
-
+    countries = []
     for country in countries_data:
-        try:
-            name = country.get("name")
-            link = country.get("country_link")
-            if not name or not link:
-                print(f"Invalid entry in JSON: {country}")
-                continue
-
-            neighbors = get_neighbors_for_country(name)
-
-            country_info = scraper.scrape_country_info(link)
+        if not country.get("name") or not country.get("country_link"):
+            print(f"Invalid entry in JSON: {country}")
+            continue
+        countries.append(country)
+    return countries
+
+
+def process_countries(
+    file_path: str,
+    border_index: Optional[BorderIndex] = None,
+    workers: int = 1,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    parse_processes: Optional[int] = 0
+) -> List[Dict[str, Any]]:
+    return aggregate_countries(
+        load_country_links(file_path),
+        border_index,
+        workers,
+        requests_per_second,
+        parse_processes
+    )
+
+
+def aggregate_countries(
+    countries: List[Dict[str, Any]],
+    border_index: Optional[BorderIndex] = None,
+    workers: int = 1,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    parse_processes: Optional[int] = 0
+) -> List[Dict[str, Any]]:
+    return list(iter_aggregated_countries(
+        countries,
+        border_index,
+        workers,
+        requests_per_second,
+        parse_processes
+    ))
+
+
+def iter_aggregated_countries(
+    countries: List[Dict[str, Any]],
+    border_index: Optional[BorderIndex] = None,
+    workers: int = 1,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    parse_processes: Optional[int] = 0,
+    client: Optional[HttpClient] = None
+) -> Iterator[Dict[str, Any]]:
+    """Scrape every country's page and yield one record per country.
+
+    Without a ``client`` the run gets its own, backed by the on-disk
+    response cache and closed when the run ends; a client passed in is
+    used as is and left open for the caller.
+    """
+    if border_index is None:
+        border_index = load_border_index()
+
+    own_client = client is None
+    if own_client:
+        client = HttpClient(
+            pool_size=max(1, workers),
+            rate_limiter=HostRateLimiter(requests_per_second),
+            cache=ResponseCache()
+        )
+    scraper = CountryScraper(client)
+    links = [country["country_link"] for country in countries]
 
-            processed_data.append({
+    try:
+        if parse_processes == 0:
+            # executor.map yields results lazily and in input order, so
+            # records are handed on as soon as the next one is scraped.
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                scraped = executor.map(scraper.scrape_country_info, links)
+                yield from _build_records(countries, scraped, border_index)
+        else:
+            scraped = scrape_pipelined(
+                scraper, links, workers, parse_processes)
+            yield from _build_records(countries, scraped, border_index)
+    finally:
+        if own_client:
+            client.close()
+            client.cache.close()
+
+
+def _build_records(
+    countries: List[Dict[str, Any]],
+    scraped: Iterable[Dict[str, str]],
+    border_index: BorderIndex
+) -> Iterator[Dict[str, Any]]:
+    for country, country_info in zip(countries, scraped):
+        name = country["name"]
+        try:
+            record = {
                 "name": name,
                 "population": country.get("population", "Unknown"),
-                "neighbors": neighbors,
+                "neighbors": border_index.neighbors_for(name),
                 "additional_info": country_info
-            })
-
-            print(f"Processed data for {name}")
+            }
+            if "revision_id" in country:
+                record["revision_id"] = country["revision_id"]
         except Exception as e:
             print(f"Failed to process {country}: {e}")
+            continue
 
-    return processed_data
+        print(f"Processed data for {name}")
+        yield record
 
 
-def save_processed_data(data: List[Dict[str, Any]], output_path: str):
+def save_processed_data(data: Iterable[Dict[str, Any]], output_path: str):
     try:
-        with open(output_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=4, ensure_ascii=False)
-        print(f"Processed data saved to {output_path}")
+        count = write_records(data, output_path)
+        print(f"Processed data for {count} countries saved to {output_path}")
     except Exception as e:
         print(f"Failed to save data: {e}")
 
 
 def main():
     input_file = 'data/countries_data_with_links.json'
-    output_file = 'data/processed_country_data_new.json'  # fara new inainte
-
-    processed_data = process_countries(input_file)
-    if processed_data:
-        save_processed_data(processed_data, output_file)
+    output_file = 'data/processed_country_data_new.jsonl'  # fara new inainte
+
+    processed_data = iter_aggregated_countries(
+        load_country_links(input_file),
+        load_border_index(),
+        workers=DEFAULT_WORKERS,
+        parse_processes=DEFAULT_PARSE_PROCESSES
+    )
+    save_processed_data(processed_data, output_file)
 
 
 if __name__ == "__main__":
@@ -1,28 +1,221 @@
-import json
+import os
 import sqlite3
-from typing import List, Dict
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from data.normalize import (
+    COUNTRY_ALIASES, classify_regimes, normalize_country_name,
+    parse_utc_offsets, split_languages
+)
+from data_operations.json_lines import iter_records
+
+FINAL_DATA_PATH = 'data/final_data.jsonl'
+LEGACY_FINAL_DATA_PATH = 'data/final_data.json'
+
+COUNTRY_COLUMNS = (
+    'name', 'population', 'capital', 'timezone', 'government', 'area',
+    'spoken_language', 'density'
+)
+
+# (table, value column, value type, staging table) for every per-country
+# child table.
+CHILD_TABLES = (
+    ('neighbors', 'neighbor', 'TEXT', 'staging_neighbors'),
+    ('country_languages', 'language', 'TEXT', 'staging_languages'),
+    ('country_utc_offsets', 'offset_minutes', 'INTEGER',
+     'staging_utc_offsets'),
+)
+
+# Columns ranked largest first into country_rankings on every load.
+RANKING_METRICS = ('population', 'density', 'area')
+
+NEIGHBORS_DDL = '''
+    CREATE TABLE IF NOT EXISTS neighbors (
+        country_id INTEGER NOT NULL,
+        neighbor TEXT NOT NULL,
+        neighbor_id INTEGER,
+        PRIMARY KEY (country_id, neighbor),
+        FOREIGN KEY (country_id) REFERENCES countries (id),
+        FOREIGN KEY (neighbor_id) REFERENCES countries (id)
+    )'''
+
+# WAL lets API readers keep working while a load writes; the mode is
+# stored in the database file, so setting it here covers every reader.
+BULK_LOAD_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
 
 
 def create_tables(cursor):
     cursor.execute('''CREATE TABLE IF NOT EXISTS countries (
     id INTEGER PRIMARY KEY,
-    name TEXT UNIQUE,
-    population INTEGER,
+    name TEXT NOT NULL UNIQUE,
+    population INTEGER NOT NULL,
     capital TEXT,
     timezone TEXT,
     government TEXT,
-    area REAL,
+    area REAL NOT NULL,
     spoken_language TEXT,
-    density REAL
+    density REAL NOT NULL
     );
     ''')
 
+    _migrate_neighbors(cursor)
+    cursor.execute(NEIGHBORS_DDL)
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS neighbors (
-        country_id INTEGER,
-        neighbor TEXT,
+    CREATE INDEX IF NOT EXISTS ix_neighbors_neighbor_id
+    ON neighbors (neighbor_id)''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_aliases (
+        alias TEXT PRIMARY KEY,
+        country_id INTEGER NOT NULL,
+        FOREIGN KEY (country_id) REFERENCES countries (id)
+    )''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_countries_population
+    ON countries (population)''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_countries_density
+    ON countries (density)''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_countries_area
+    ON countries (area)''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_languages (
+        language TEXT NOT NULL,
+        country_id INTEGER NOT NULL,
+        PRIMARY KEY (language, country_id),
         FOREIGN KEY (country_id) REFERENCES countries (id)
     )''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_country_languages_country_id
+    ON country_languages (country_id)''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_utc_offsets (
+        offset_minutes INTEGER NOT NULL,
+        country_id INTEGER NOT NULL,
+        PRIMARY KEY (offset_minutes, country_id),
+        FOREIGN KEY (country_id) REFERENCES countries (id)
+    )''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_country_utc_offsets_country_id
+    ON country_utc_offsets (country_id)''')
+    _migrate_timezones(cursor)
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_regimes (
+        regime TEXT NOT NULL,
+        country_id INTEGER NOT NULL,
+        PRIMARY KEY (regime, country_id),
+        FOREIGN KEY (country_id) REFERENCES countries (id)
+    )''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS ix_country_regimes_country_id
+    ON country_regimes (country_id)''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_rankings (
+        metric TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        country_id INTEGER NOT NULL,
+        PRIMARY KEY (metric, rank),
+        UNIQUE (metric, country_id),
+        FOREIGN KEY (country_id) REFERENCES countries (id)
+    ) WITHOUT ROWID''')
+
+    # Full-text index over the countries table itself; the loader rebuilds
+    # it after every load rather than keeping triggers on countries.
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS countries_fts USING fts5 (
+        name, capital, spoken_language, government,
+        content = 'countries',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS country_revisions (
+        country_id INTEGER PRIMARY KEY,
+        revision_id INTEGER NOT NULL,
+        FOREIGN KEY (country_id) REFERENCES countries (id)
+    )''')
+
+
+def _migrate_neighbors(cursor):
+    """Bring a neighbors table from an older schema up to date."""
+    columns = cursor.execute('PRAGMA table_info(neighbors)').fetchall()
+    if not columns:
+        return
+
+    if any(column[5] for column in columns):
+        if not any(column[1] == 'neighbor_id' for column in columns):
+            cursor.execute('''
+            ALTER TABLE neighbors ADD COLUMN neighbor_id INTEGER
+            REFERENCES countries (id)''')
+        return
+
+    # Created before it had a primary key: rebuild it.
+    cursor.execute('ALTER TABLE neighbors RENAME TO neighbors_old')
+    cursor.execute(NEIGHBORS_DDL)
+    cursor.execute('''
+    INSERT OR IGNORE INTO neighbors (country_id, neighbor)
+    SELECT country_id, neighbor FROM neighbors_old
+    WHERE country_id IS NOT NULL AND neighbor IS NOT NULL
+    ''')
+    cursor.execute('DROP TABLE neighbors_old')
+
+
+def _migrate_timezones(cursor):
+    """Replace the old text country_timezones table with offsets."""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'country_timezones'"
+    ).fetchone()
+    if not exists:
+        return
+
+    cursor.executemany(
+        'INSERT OR IGNORE INTO country_utc_offsets VALUES (?, ?)',
+        [
+            (offset, country_id)
+            for country_id, timezone in cursor.execute(
+                'SELECT id, timezone FROM countries').fetchall()
+            for offset in parse_utc_offsets(timezone)
+        ]
+    )
+    cursor.execute('DROP TABLE country_timezones')
+
+
+def create_staging_tables(cursor):
+    cursor.execute('''
+    CREATE TEMP TABLE IF NOT EXISTS staging_countries (
+        name TEXT PRIMARY KEY,
+        population INTEGER,
+        capital TEXT,
+        timezone TEXT,
+        government TEXT,
+        area REAL,
+        spoken_language TEXT,
+        density REAL,
+        revision_id INTEGER
+    )''')
+    cursor.execute('DELETE FROM staging_countries')
+
+    for _, column, value_type, staging in CHILD_TABLES:
+        cursor.execute(f'''
+        CREATE TEMP TABLE IF NOT EXISTS {staging} (
+            name TEXT,
+            {column} {value_type},
+            PRIMARY KEY (name, {column})
+        )''')
+        cursor.execute(f'DELETE FROM {staging}')
 
 
 def get_safe_value(dict_obj, *keys):
@@ -33,43 +226,265 @@ def get_safe_value(dict_obj, *keys):
     return None
 
 
-def import_data(data: List[Dict], db_path: str = 'countries.db'):
-    conn = sqlite3.connect(db_path)
+def country_row(country: Dict[str, Any]) -> Tuple:
+    additional = country.get('additional_info', {})
+    return (
+        country.get('name'),
+        int(country.get('population', 0)),
+        get_safe_value(additional, 'Capital Name', 'Capital'),
+        get_safe_value(additional, 'Timezone', 'Time Zone'),
+        get_safe_value(additional, 'Government'),
+        float(get_safe_value(additional, 'Area', 0)),
+        get_safe_value(additional, 'Spoken Language',
+                       'Spoken Languages', 'Language', 'Languages'),
+        float(get_safe_value(additional, 'Density', 0)),
+        country.get('revision_id')
+    )
+
+
+def child_values(country: Dict[str, Any], row: Tuple) -> Tuple[List, ...]:
+    """Values for each of CHILD_TABLES, in the same order."""
+    offsets = country.get('additional_info', {}).get('UTC Offsets')
+    return (
+        country.get('neighbors', []),
+        split_languages(row[6]),
+        offsets if offsets is not None else parse_utc_offsets(row[3]),
+    )
+
+
+def _stage(cursor, data: Iterable[Dict]):
+    """Write each country and its child rows as soon as it is read.
+
+    Child rows go through a second cursor while the first one is still
+    consuming ``data``, so nothing is held back in Python.
+    """
+    children = cursor.connection.cursor()
+
+    def rows() -> Iterator[Tuple]:
+        for country in data:
+            row = country_row(country)
+            for (*_, staging), values in zip(
+                    CHILD_TABLES, child_values(country, row)):
+                children.executemany(
+                    f'INSERT OR IGNORE INTO {staging} VALUES (?, ?)',
+                    ((row[0], value) for value in values))
+            yield row
+
+    try:
+        cursor.executemany(
+            'INSERT OR REPLACE INTO staging_countries VALUES '
+            '(?, ?, ?, ?, ?, ?, ?, ?, ?)', rows())
+    finally:
+        children.close()
+
+
+def _stage_keep_names(cursor, keep_names: Iterable[str]):
+    cursor.execute(
+        'CREATE TEMP TABLE IF NOT EXISTS keep_names (name TEXT PRIMARY KEY)')
+    cursor.execute('DELETE FROM keep_names')
+    cursor.executemany('INSERT OR IGNORE INTO keep_names VALUES (?)',
+                       ((name,) for name in keep_names))
+
+
+def _apply_staging(cursor, prune: bool):
+    columns = ', '.join(COUNTRY_COLUMNS)
+    updates = ', '.join(
+        f'{column} = excluded.{column}' for column in COUNTRY_COLUMNS[1:])
+    cursor.execute(f'''
+    INSERT INTO countries ({columns})
+    SELECT {columns} FROM staging_countries WHERE true
+    ON CONFLICT (name) DO UPDATE SET {updates}
+    ''')
+
+    if prune:
+        # Only countries gone from the source list are stale; one whose
+        # page failed to scrape this run is kept as it was.
+        stale = '''
+        SELECT id FROM countries
+        WHERE name NOT IN (SELECT name FROM keep_names)
+        AND name NOT IN (SELECT name FROM staging_countries)'''
+        for table, *_ in CHILD_TABLES:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE country_id IN ({stale})')
+        cursor.execute(
+            f'DELETE FROM country_revisions WHERE country_id IN ({stale})')
+        cursor.execute(
+            f'DELETE FROM country_aliases WHERE country_id IN ({stale})')
+        cursor.execute(
+            f'DELETE FROM country_regimes WHERE country_id IN ({stale})')
+        cursor.execute(f'DELETE FROM countries WHERE id IN ({stale})')
+
+    staged_ids = '''
+    SELECT c.id FROM countries c JOIN staging_countries s ON s.name = c.name'''
+    for table, column, _, staging in CHILD_TABLES:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE country_id IN ({staged_ids})')
+        cursor.execute(f'''
+        INSERT INTO {table} (country_id, {column})
+        SELECT c.id, s.{column}
+        FROM {staging} s JOIN countries c ON c.name = s.name
+        ''')
+
+    cursor.execute('''
+    INSERT OR REPLACE INTO country_revisions (country_id, revision_id)
+    SELECT c.id, s.revision_id
+    FROM staging_countries s JOIN countries c ON c.name = s.name
+    WHERE s.revision_id IS NOT NULL
+    ''')
+
+
+def _resolve_neighbors(cursor) -> List[str]:
+    """Point every neighbor at a countries.id through country_aliases.
+
+    Each country is reachable by its normalised name and by the spellings in
+    COUNTRY_ALIASES. All rows are re-resolved, so a country added by an
+    incremental load also fixes up neighbors recorded earlier. Returns the
+    neighbor names that still match no country.
+    """
+    cursor.execute('''
+    INSERT OR REPLACE INTO country_aliases (alias, country_id)
+    SELECT normalize_country_name(name), id FROM countries
+    ''')
+    cursor.executemany('''
+    INSERT OR REPLACE INTO country_aliases (alias, country_id)
+    SELECT ?, country_id FROM country_aliases WHERE alias = ?
+    ''', [
+        (normalize_country_name(alias), normalize_country_name(name))
+        for alias, name in COUNTRY_ALIASES.items()
+    ])
+
+    cursor.execute('''
+    UPDATE neighbors SET neighbor_id = (
+        SELECT a.country_id FROM country_aliases a
+        WHERE a.alias = normalize_country_name(neighbors.neighbor)
+    )''')
+    return [row[0] for row in cursor.execute('''
+    SELECT DISTINCT neighbor FROM neighbors
+    WHERE neighbor_id IS NULL ORDER BY neighbor
+    ''')]
+
+
+def _classify_regimes(cursor):
+    """Re-tag every country from its government text.
+
+    This runs over the whole table, not just the staged rows, so a change
+    to REGIME_MAPPING takes effect on the next load of any kind.
+    """
+    tags = [
+        (regime, country_id)
+        for country_id, government in cursor.execute(
+            'SELECT id, government FROM countries').fetchall()
+        for regime in classify_regimes(government)
+    ]
+    cursor.execute('DELETE FROM country_regimes')
+    cursor.executemany('INSERT INTO country_regimes VALUES (?, ?)', tags)
+
+
+def _rank_countries(cursor):
+    """Rebuild country_rankings; ties keep id order like the old sorts."""
+    cursor.execute('DELETE FROM country_rankings')
+    for metric in RANKING_METRICS:
+        cursor.execute(f'''
+        INSERT INTO country_rankings (metric, rank, country_id)
+        SELECT ?, ROW_NUMBER() OVER (ORDER BY {metric} DESC, id), id
+        FROM countries
+        ''', (metric,))
+
+
+def _bump_dataset_version(cursor):
+    """Tell readers such as CountryService that the dataset changed."""
+    version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    cursor.execute(f'PRAGMA user_version = {int(version) + 1}')
+
+
+def import_data(
+    data: Iterable[Dict],
+    db_path: str = 'countries.db',
+    keep_names: Optional[Iterable[str]] = None
+) -> int:
+    """Upsert countries and their neighbors in a single transaction.
+
+    Rows are bulk loaded into temporary staging tables first and then merged
+    into the real tables, so readers see either the previous dataset or the
+    new one. With ``keep_names``, the names in the source list, stored
+    countries that are neither in it nor in ``data`` are deleted, which is
+    what a full refresh wants; incremental loads leave them alone.
+
+    ``data`` may be a slow generator such as the live scrape. It is read
+    into the connection's TEMP tables before the write transaction starts,
+    so the database is only locked while the staged rows are merged.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.create_function(
+        'normalize_country_name', 1, normalize_country_name,
+        deterministic=True)
     cursor = conn.cursor()
 
-    create_tables(cursor)
+    for pragma in BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
 
-    for country in data:
-        additional = country.get('additional_info', {})
-        cursor.execute('''
-        INSERT INTO countries (name, population, capital, timezone, government,
-                            area, spoken_language, density)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            country.get('name'),
-            int(country.get('population', 0)),
-            get_safe_value(additional, 'Capital Name', 'Capital'),
-            get_safe_value(additional, 'Timezone', 'Time Zone'),
-            get_safe_value(additional, 'Government'),
-            float(get_safe_value(additional, 'Area', 0)),
-            get_safe_value(additional, 'Spoken Language',
-                           'Spoken Languages', 'Language', 'Languages'),
-            float(get_safe_value(additional, 'Density', 0))
-        ))
-
-        country_id = cursor.lastrowid
-
-        for neighbor in country.get('neighbors', []):
-            cursor.execute('''
-            INSERT INTO neighbors (country_id, neighbor)
-            VALUES (?, ?)
-            ''', (country_id, neighbor))
+    try:
+        # Autocommit writes to TEMP tables only, which lock nothing that
+        # API readers or another loader use.
+        create_staging_tables(cursor)
+        _stage(cursor, data)
+        if keep_names is not None:
+            _stage_keep_names(cursor, keep_names)
+
+        cursor.execute('BEGIN IMMEDIATE')
+        create_tables(cursor)
+        _apply_staging(cursor, prune=keep_names is not None)
+        unresolved = _resolve_neighbors(cursor)
+        _classify_regimes(cursor)
+        _rank_countries(cursor)
+        cursor.execute(
+            "INSERT INTO countries_fts (countries_fts) VALUES ('rebuild')")
+        _bump_dataset_version(cursor)
+        loaded = cursor.execute(
+            'SELECT COUNT(*) FROM staging_countries').fetchone()[0]
+        cursor.execute('COMMIT')
+    except Exception:
+        # BEGIN IMMEDIATE itself may have failed, e.g. on a locked database.
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
 
+    if unresolved:
+        print(
+            f"{len(unresolved)} neighbor names match no country: "
+            f"{', '.join(unresolved)}"
+        )
+    return loaded
+
+
+def get_known_sources(
+    db_path: str = 'countries.db'
+) -> Dict[str, Tuple[Optional[int], int]]:
+    """Map each stored country to its (revision_id, population)."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    create_tables(cursor)
     conn.commit()
+
+    rows = cursor.execute('''
+    SELECT c.name, r.revision_id, c.population
+    FROM countries c
+    LEFT JOIN country_revisions r ON r.country_id = c.id
+    ''').fetchall()
     conn.close()
+    return {name: (revision_id, population)
+            for name, revision_id, population in rows}
 
 
 if __name__ == "__main__":
-    with open('data/final_data.json', 'r') as f:
-        data = json.load(f)
-    import_data(data)
+    if len(sys.argv) > 1:
+        data_path = sys.argv[1]
+    elif os.path.exists(FINAL_DATA_PATH):
+        data_path = FINAL_DATA_PATH
+    else:
+        data_path = LEGACY_FINAL_DATA_PATH
+    # The file is the whole dataset: countries missing from it are dropped.
+    import_data(iter_records(data_path),
+                keep_names=(r['name'] for r in iter_records(data_path)))
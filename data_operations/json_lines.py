@@ -0,0 +1,33 @@
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a newline-delimited JSON file one at a time.
+
+    Files holding a single JSON array, as written by earlier versions of
+    the pipeline, are still accepted but have to be loaded whole.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        first = file.read(1)
+        while first.isspace():
+            first = file.read(1)
+        file.seek(0)
+
+        if first == '[':
+            yield from json.load(file)
+            return
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_records(records: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False))
+            file.write('\n')
+            count += 1
+    return count
@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Optional
+
+from data_operations.data_aggregator import (
+    DEFAULT_PARSE_PROCESSES, DEFAULT_WORKERS, iter_aggregated_countries,
+    load_country_links
+)
+from data_operations.db_seed import get_known_sources, import_data
+from data_operations.pre_process_data import clean_countries, clean_number
+from scrapers.border_scraper import load_border_index
+from scrapers.http_client import HttpClient
+from scrapers.revision_scraper import fetch_revisions
+
+
+def select_changed_countries(
+    countries: List[Dict[str, Any]],
+    db_path: str = 'countries.db',
+    client: Optional[HttpClient] = None
+) -> List[Dict[str, Any]]:
+    """Keep only countries whose article revision or population changed.
+
+    Each returned entry carries its current ``revision_id`` so the loader
+    can record it next to the country row.
+    """
+    known = get_known_sources(db_path)
+    revisions = fetch_revisions(
+        [c["country_link"] for c in countries], client)
+
+    changed = []
+    for country in countries:
+        revision_id = revisions.get(country["country_link"])
+        population = clean_number(country.get("population"))
+        stored_revision, stored_population = known.get(
+            country["name"], (None, None))
+
+        if (revision_id is None or revision_id != stored_revision
+                or population is None
+                or int(float(population)) != stored_population):
+            changed.append({**country, "revision_id": revision_id})
+
+    return changed
+
+
+def refresh(
+    input_file: str = 'data/countries_data_with_links.json',
+    db_path: str = 'countries.db',
+    incremental: bool = True,
+    workers: int = DEFAULT_WORKERS
+) -> int:
+    countries = load_country_links(input_file)
+    # A full refresh drops only countries gone from the link list, never
+    # one whose page failed to scrape this time.
+    keep_names = None if incremental else {c["name"] for c in countries}
+    if incremental:
+        countries = select_changed_countries(countries, db_path)
+        print(f"{len(countries)} countries changed since the last refresh")
+
+    if not countries:
+        return 0
+
+    # Every stage is a generator, so each record flows scrape -> clean ->
+    # staging table without the whole dataset being held in memory.
+    processed = iter_aggregated_countries(
+        countries,
+        load_border_index(),
+        workers,
+        parse_processes=DEFAULT_PARSE_PROCESSES
+    )
+    cleaned = clean_countries(processed)
+    return import_data(cleaned, db_path, keep_names)
+
+
+if __name__ == "__main__":
+    refresh()
@@ -1,4 +1,7 @@
-import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from data.normalize import parse_utc_offsets
+from data_operations.json_lines import iter_records, write_records
 
 
 def clean_number(number_str):
@@ -12,42 +15,62 @@ def clean_number(number_str):
         return None
 
 
-def process_json_file():
-    with open('data/processed_country_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def clean_country(country: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    population = clean_number(country.get('population'))
 
-    cleaned_data = []
+    add_info = country.get('additional_info', {})
+    area = clean_number(add_info.get('Area'))
+    density = clean_number(add_info.get('Density'))
 
-    for country in data:
-        population = clean_number(country.get('population'))
+    if not all([population, area, density]):
+        print(
+            f"Skipping {country['name']} due to invalid numerical data"
+        )
+        return None
+
+    country['population'] = population
+    add_info['Area'] = area
+    add_info['Density'] = density
 
-        add_info = country.get('additional_info', {})
-        area = clean_number(add_info.get('Area'))
-        density = clean_number(add_info.get('Density'))
+    capital_name = add_info.get('Capital Name')
+    if capital_name and 'city-state' in capital_name.lower():
+        add_info['Capital Name'] = country['name']
 
-        if not all([population, area, density]):
-            print(
-                f"Skipping {country['name']} due to invalid numerical data"
-            )
-            continue
+    # Older scrapes only kept the raw timezone text.
+    if 'UTC Offsets' not in add_info:
+        offsets = parse_utc_offsets(add_info.get('Timezone'))
+        if offsets:
+            add_info['UTC Offsets'] = offsets
+
+    return country
+
+
+def clean_countries(
+    data: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    for country in data:
+        if cleaned := clean_country(country):
+            yield cleaned
 
-        country['population'] = population
-        add_info['Area'] = area
-        add_info['Density'] = density
 
-        capital_name = add_info.get('Capital Name')
-        if capital_name and 'city-state' in capital_name.lower():
-            add_info['Capital Name'] = country['name']
+def process_json_file(
+    input_path: str = 'data/processed_country_data.jsonl',
+    output_path: str = 'data/final_data.jsonl'
+) -> int:
+    total = 0
 
-        cleaned_data.append(country)
+    def counted(records: Iterable[Dict[str, Any]]):
+        nonlocal total
+        for record in records:
+            total += 1
+            yield record
 
-    with open('data/final_data.json', 'w', encoding='utf-8') as file:
-        json.dump(cleaned_data, file, indent=4, ensure_ascii=False)
+    kept = write_records(
+        clean_countries(counted(iter_records(input_path))), output_path)
 
-    print(
-        f"Processed {len(data)} countries, kept {len(cleaned_data)} countries")
-    return cleaned_data
+    print(f"Processed {total} countries, kept {kept} countries")
+    return kept
 
 
 if __name__ == "__main__":
-    cleaned_data = process_json_file()
+    process_json_file()
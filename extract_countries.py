@@ -1,13 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 from urllib.parse import urljoin
 
+from scrapers import http_client
+
 BASE_URL = "https://en.wikipedia.org"
 
 URL = "https://en.wikipedia.org/wiki/List_of_countries_and_dependencies_by_population"
 
-response = requests.get(URL)
+response = http_client.get(URL)
 soup = BeautifulSoup(response.content, 'html.parser')
 
 table = soup.find('table', {'class': 'wikitable'})
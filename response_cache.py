@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from flask import Response, current_app, request
+
+from services.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    etag: str
+    encodings: Dict[str, bytes]
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def tag_for(self, encoding: str) -> str:
+        # Strong ETags must differ between representations of the resource.
+        if encoding == 'identity':
+            return self.etag
+        return f"{self.etag}-{encoding}"
+
+
+def encode_json(
+    data: Any,
+    headers_for: Optional[Callable[[Any], Dict[str, str]]] = None
+) -> EncodedBody:
+    body = current_app.json.dumps(data).encode('utf-8')
+    encodings = {'identity': body}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encodings['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+        if brotli:
+            encodings['br'] = brotli.compress(body)
+    return EncodedBody(
+        hashlib.sha256(body).hexdigest()[:32],
+        encodings,
+        headers_for(data) if headers_for else {}
+    )
+
+
+class ResponseCache:
+    """Pre-encoded JSON bodies keyed by dataset version, route and args."""
+
+    def __init__(self, maxsize: int = 512):
+        self.bodies = LRUCache(maxsize)
+
+    def get_or_encode(
+        self,
+        key: Hashable,
+        producer: Callable[[], Any],
+        headers_for: Optional[Callable[[Any], Dict[str, str]]] = None
+    ) -> EncodedBody:
+        hit, encoded = self.bodies.get(key)
+        if not hit:
+            encoded = encode_json(producer(), headers_for)
+            self.bodies.set(key, encoded)
+        return encoded
+
+    def json_response(
+        self,
+        version: int,
+        producer: Callable[[], Any],
+        max_age: int = 60,
+        headers_for: Optional[Callable[[Any], Dict[str, str]]] = None
+    ) -> Response:
+        key = (
+            version,
+            request.path,
+            tuple(sorted(request.args.items(multi=True)))
+        )
+        encoded = self.get_or_encode(key, producer, headers_for)
+
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if (candidate in encoded.encodings
+                    and candidate in request.accept_encodings):
+                encoding = candidate
+                break
+
+        headers = {
+            **encoded.headers,
+            'ETag': f'"{encoded.tag_for(encoding)}"',
+            'Cache-Control': f'public, max-age={max_age}',
+            'Vary': 'Accept-Encoding',
+        }
+
+        tags = {encoded.tag_for(name) for name in encoded.encodings}
+        if any(tag in request.if_none_match for tag in tags):
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(
+            encoded.encodings[encoding],
+            status=200,
+            mimetype='application/json',
+            headers=headers
+        )
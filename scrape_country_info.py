@@ -2,6 +2,8 @@ import requests
 from bs4 import BeautifulSoup
 import re
 
+from scrapers import http_client
+
 
 def clean_text(text):
     if text:
@@ -122,7 +124,7 @@ def extract_density(infobox):
 
 def scrape_country_info(url):
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response = http_client.get(url)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
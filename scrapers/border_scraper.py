@@ -1,72 +1,99 @@
-import requests
+from functools import lru_cache
+
 from bs4 import BeautifulSoup
 from typing import List, Dict
 
+from data.normalize import normalize_country_name
+from scrapers import http_client
+
+BORDERS_URL = (
+    "https://en.wikipedia.org/wiki/List_of_countries_and_territories_by_"
+    "number_of_land_borders"
+)
+
+
+class BorderIndex(dict):
+    def __init__(self, country_neighbors: Dict[str, List[str]]):
+        super().__init__(country_neighbors)
+        self._by_normalized = {
+            normalize_country_name(country): neighbors
+            for country, neighbors in country_neighbors.items()
+        }
+
+    def neighbors_for(self, country_name: str) -> List[str]:
+        if country_name in self:
+            return self[country_name]
+
+        normalized = normalize_country_name(country_name)
+        if normalized not in self._by_normalized:
+            print(
+                f"Country '{country_name}' not found on the borders wiki page"
+            )
+            return []
+        return self._by_normalized[normalized]
+
 
 def get_countries_and_neighbors() -> Dict[str, List[str]]:
-    url = (
-        "https://en.wikipedia.org/wiki/List_of_countries_and_territories_by_"
-        "number_of_land_borders"
-    )
+    """Parse the land borders table.
 
-    headers = {'User-Agent': 'Mozilla/5.0'}
+    Raises instead of returning an empty mapping: an empty index would
+    make a full refresh delete every stored neighbor.
+    """
+    response = http_client.get(BORDERS_URL)
+    response.raise_for_status()
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'html.parser')
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    table = soup.find('table', class_='wikitable sortable')
+    if not table:
+        raise ValueError("Borders table not found")
 
-        table = soup.find('table', class_='wikitable sortable')
-        if not table:
-            print("Table not found")
-            return {}
+    tbody = table.find('tbody')
+    if not tbody:
+        raise ValueError("Borders table has no tbody")
 
-        tbody = table.find('tbody')
-        if not tbody:
-            print("Tbody not found")
-            return {}
+    rows = tbody.find_all('tr')
+    country_neighbors = {}
 
-        rows = tbody.find_all('tr')
-        country_neighbors = {}
+    for row in rows[1:]:
+        tds = row.find_all('td')
+        if len(tds) >= 6:
+            first_td = tds[0]
+            country_a_tag = first_td.find('a')
 
-        for row in rows[1:]:
-            tds = row.find_all('td')
-            if len(tds) >= 6:
-                first_td = tds[0]
-                country_a_tag = first_td.find('a')
+            last_td = tds[5]
+            neighbor_a_tags = last_td.find_all('a')
 
-                last_td = tds[5]
-                neighbor_a_tags = last_td.find_all('a')
+            if country_a_tag:
+                country = country_a_tag.get_text().strip()
+                neighbors = [a.get_text().strip() for a in neighbor_a_tags]
 
-                if country_a_tag:
-                    country = country_a_tag.get_text().strip()
-                    neighbors = [a.get_text().strip() for a in neighbor_a_tags]
+                neighbors = [
+                    neighbor for neighbor in neighbors
+                    if neighbor and "[" not in neighbor and "]"
+                    not in neighbor
+                ]
 
-                    neighbors = [
-                        neighbor for neighbor in neighbors
-                        if neighbor and "[" not in neighbor and "]"
-                        not in neighbor
-                    ]
+                country_neighbors[country] = neighbors
 
-                    country_neighbors[country] = neighbors
+    if not country_neighbors:
+        raise ValueError("Borders table has no countries")
+    return country_neighbors
 
-        return country_neighbors
 
-    except Exception as e:
-        print(f"An error occurred while fetching country data: {e}")
-        return {}
+@lru_cache(maxsize=1)
+def load_border_index() -> BorderIndex:
+    """Download and parse the land borders page once per process.
+
+    A failed download raises and is not cached, so the next call retries.
+    Call ``load_border_index.cache_clear()`` to force a fresh download.
+    """
+    return BorderIndex(get_countries_and_neighbors())
 
 
 def get_neighbors_for_country(country_name: str) -> List[str]:
     try:
-        country_neighbors = get_countries_and_neighbors()
-        if country_name not in country_neighbors:
-            print(
-                f"Country '{country_name}' not found on the borders wiki page"
-            )
-            return []
-        return country_neighbors.get(country_name, [])
+        return load_border_index().neighbors_for(country_name)
     except Exception as e:
         print(
             f"An error occurred while fetching neighbors for {country_name}: "
@@ -1,95 +1,138 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import re
-from typing import Optional, Dict, List
+from dataclasses import dataclass
+from typing import Any, Optional, Dict, List, Pattern
+
+from data.normalize import parse_utc_offsets
+from scrapers.http_client import HttpClient, get_client
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only the infobox is ever read, so the rest of the article is not built
+# into a tree at all. The class attribute is still a raw string while the
+# document is being parsed, hence the regex.
+INFOBOX_STRAINER = SoupStrainer(
+    'table', class_=re.compile(r'(^|\s)infobox(\s|$)'))
+
+_FOOTNOTE = re.compile(r'\[.*?\]')
+_PARENTHESES = re.compile(r'\(.*?\)')
+_WHITESPACE = re.compile(r'\s+')
+_GLUED_WORDS = re.compile(r'(?<=[a-zA-Z])(?=[A-Z])')
+
+_CAPITAL = re.compile(r'Capital|Capital city|Capital and largest city',
+                      re.IGNORECASE)
+_TIMEZONE = re.compile(r'Time Zone', re.IGNORECASE)
+_GOVERNMENT = re.compile(r'Government|Government type|Government Form',
+                         re.IGNORECASE)
+_LANGUAGE = re.compile(r'Official language|Official languages',
+                       re.IGNORECASE)
+_TOTAL = re.compile(r'Total', re.IGNORECASE)
+_DENSITY = re.compile(r'Density', re.IGNORECASE)
+
+_KM_AREA = re.compile(r'([\d,]+(?:\.\d+)?)\s*km²?')
+_MI_AREA = re.compile(r'([\d,]+(?:\.\d+)?)\s*sq\s*mi')
+_KM_DENSITY = re.compile(
+    r'([\d,.]+)(?:\[[\d\w]+\])?(?:\s*\/\s*km2|\s*\/\s*km²)', re.IGNORECASE)
+_MI_DENSITY = re.compile(
+    r'([\d,.]+)(?:\[[\d\w]+\])?(?:\s*\/\s*sq\s*mi)', re.IGNORECASE)
 
 
 class TextCleaner:
     @staticmethod
     def clean_text(text: Optional[str]) -> Optional[str]:
         if text:
-            text = re.sub(r'\[.*?\]', '', text).strip()
-            text = re.sub(r'\(.*?\)', '', text).strip()
-            text = re.sub(r'\s+', ' ', text)
+            text = _FOOTNOTE.sub('', text).strip()
+            text = _PARENTHESES.sub('', text).strip()
+            text = _WHITESPACE.sub(' ', text)
             return text
         return None
 
 
+@dataclass
+class InfoboxRow:
+    label: str
+    label_string: Optional[str]
+    is_label: bool
+    fake_li: Optional[str]
+    cell: Optional[Tag]
+
+
 class WikiInfoboxParser:
     def __init__(self, infobox: BeautifulSoup):
         self.infobox = infobox
-
-    def _find_row_by_terms(
+        self.rows = self._index_rows()
+
+    def _index_rows(self) -> List[InfoboxRow]:
+        """Walk the infobox once and pair every header with its data cell."""
+        rows = []
+        for th in self.infobox.find_all('th'):
+            fake_li = th.find('div', class_='ib-country-fake-li')
+            rows.append(InfoboxRow(
+                label=th.get_text(strip=True).replace('\xa0', ' '),
+                label_string=th.string,
+                is_label='infobox-label' in th.get('class', []),
+                fake_li=fake_li.string if fake_li else None,
+                cell=th.find_next_sibling('td')
+            ))
+        return rows
+
+    def _find_cell(
         self,
-        terms: List[str],
-        tag: str = 'th',
-        class_name: Optional[str] = None
-    ) -> Optional[BeautifulSoup]:
-        rows = self.infobox.find_all(tag, class_=class_name)
-        for row in rows:
-            full_text = row.get_text(strip=True).replace('\xa0', ' ')
-            for term in terms:
-                if re.search(term, full_text, re.IGNORECASE):
-                    return row
+        pattern: Pattern,
+        by_label: bool = False
+    ) -> Optional[Tag]:
+        for row in self.rows:
+            if by_label:
+                matched = row.is_label and pattern.search(row.label)
+            else:
+                matched = row.label_string and pattern.search(row.label_string)
+            if matched:
+                return row.cell
+        return None
+
+    def _find_fake_li_cell(self, pattern: Pattern) -> Optional[Tag]:
+        for row in self.rows:
+            if row.fake_li and pattern.search(row.fake_li):
+                return row.cell
         return None
 
     def extract_capital(self) -> Optional[str]:
-        capital_terms = ['Capital', 'Capital city', 'Capital and largest city']
-        capital_row = self._find_row_by_terms(
-            capital_terms,
-            'th',
-            'infobox-label'
-        )
-
-        if capital_row:
-            capital_cell = capital_row.find_next('td', class_='infobox-data')
-            if capital_cell and (capital_link := capital_cell.find('a')):
-                return TextCleaner.clean_text(capital_link.get_text())
+        capital_cell = self._find_cell(_CAPITAL, by_label=True)
+        if capital_cell and (capital_link := capital_cell.find('a')):
+            return TextCleaner.clean_text(capital_link.get_text())
         return None
 
     def extract_timezone(self) -> Optional[str]:
-        timezone_terms = [r'Time Zone']
-        for term in timezone_terms:
-            timezone_row = self.infobox.find(
-                'th', string=re.compile(term, re.IGNORECASE))
-            if timezone_row:
-                timezone_cell = timezone_row.find_next('td')
-                timezone = TextCleaner.clean_text(timezone_cell.get_text())
-                return timezone
+        timezone_cell = self._find_cell(_TIMEZONE)
+        if timezone_cell:
+            return TextCleaner.clean_text(timezone_cell.get_text())
         return None
 
+    def extract_utc_offsets(self) -> Optional[List[int]]:
+        return parse_utc_offsets(self.extract_timezone()) or None
+
     def extract_government(self) -> Optional[str]:
-        government_terms = [r'Government',
-                            r'Government type', r'Government Form']
-        for term in government_terms:
-            government_row = self.infobox.find(
-                'th', string=re.compile(term, re.IGNORECASE))
-            if government_row:
-                government_cell = government_row.find_next('td')
-                government = TextCleaner.clean_text(government_cell.get_text())
-                return government
+        government_cell = self._find_cell(_GOVERNMENT)
+        if government_cell:
+            return TextCleaner.clean_text(government_cell.get_text())
         return None
 
     def extract_area(self) -> Optional[str]:
-        total_div = self.infobox.find(
-            'div',
-            class_='ib-country-fake-li',
-            string=re.compile(r'Total', re.IGNORECASE)
-        )
-
-        if not total_div:
-            return None
-
-        total_td = total_div.find_next('td')
+        total_td = self._find_fake_li_cell(_TOTAL)
         if not total_td:
             return None
 
         raw_text = ''.join(total_td.stripped_strings)
 
-        if km_area := re.search(r'([\d,]+(?:\.\d+)?)\s*km²?', raw_text):
+        if km_area := _KM_AREA.search(raw_text):
             return km_area.group(1).replace(',', '')
 
-        if mi_area := re.search(r'([\d,]+(?:\.\d+)?)\s*sq\s*mi', raw_text):
+        if mi_area := _MI_AREA.search(raw_text):
             mi_value = float(mi_area.group(1).replace(',', ''))
             km_value = mi_value * 2.58999
             return f"{km_value:,.2f}".rstrip('0').rstrip('.')
@@ -97,30 +140,17 @@ class WikiInfoboxParser:
         return raw_text
 
     def extract_density(self) -> Optional[str]:
-        density_div = self.infobox.find(
-            'div',
-            class_='ib-country-fake-li',
-            string=re.compile(r'Density', re.IGNORECASE)
-        )
-
-        if not density_div:
-            return None
-
-        density_td = density_div.find_next('td')
+        density_td = self._find_fake_li_cell(_DENSITY)
         if not density_td:
             return None
 
         raw_text = ''.join(density_td.stripped_strings)
 
-        km_pattern = (
-            r'([\d,.]+)(?:\[[\d\w]+\])?(?:\s*\/\s*km2|\s*\/\s*km²)'
-        )
-        if km_match := re.search(km_pattern, raw_text, re.IGNORECASE):
+        if km_match := _KM_DENSITY.search(raw_text):
             value = float(km_match.group(1).replace(',', '.'))
             return f"{value:.1f}"
 
-        mi_pattern = r'([\d,.]+)(?:\[[\d\w]+\])?(?:\s*\/\s*sq\s*mi)'
-        if mi_match := re.search(mi_pattern, raw_text, re.IGNORECASE):
+        if mi_match := _MI_DENSITY.search(raw_text):
             mi_value = float(mi_match.group(1).replace(',', '.'))
             km_value = mi_value * 0.386102
             return f"{km_value:.1f}"
@@ -128,46 +158,48 @@ class WikiInfoboxParser:
         return None
 
     def extract_spoken_language(self) -> Optional[str]:
-        language_row = self._find_row_by_terms(
-            ['Official language', 'Official languages'],
-            'th',
-            'infobox-label'
-        )
-        if language_row:
-            language_cell = language_row.find_next('td', class_='infobox-data')
-            if language_cell:
-                languages = TextCleaner.clean_text(language_cell.get_text())
-                text = re.sub(r'(?<=[a-zA-Z])(?=[A-Z])', ', ', languages)
-                return text.strip()
+        language_cell = self._find_cell(_LANGUAGE, by_label=True)
+        if language_cell:
+            languages = TextCleaner.clean_text(language_cell.get_text())
+            if languages:
+                return _GLUED_WORDS.sub(', ', languages).strip()
         return None
 
+    def extract_all(self) -> Dict[str, Any]:
+        country_info = {
+            'Capital Name': self.extract_capital(),
+            'Timezone': self.extract_timezone(),
+            'UTC Offsets': self.extract_utc_offsets(),
+            'Government': self.extract_government(),
+            'Area': self.extract_area(),
+            'Spoken Language': self.extract_spoken_language(),
+            'Density': self.extract_density()
+        }
+        return {k: v for k, v in country_info.items() if v is not None}
+
+
+def parse_country_html(html: str) -> Dict[str, Any]:
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=INFOBOX_STRAINER)
+    infobox = soup.find('table', class_='infobox')
+
+    if not infobox:
+        return {"error": "Infobox not found"}
+
+    return WikiInfoboxParser(infobox).extract_all()
+
 
 class CountryScraper:
-    def __init__(self):
-        self.headers = {'User-Agent': 'Mozilla/5.0'}
+    def __init__(self, client: Optional[HttpClient] = None):
+        self.client = client or get_client()
+
+    def fetch_html(self, url: str) -> str:
+        response = self.client.get(url)
+        response.raise_for_status()
+        return response.text
 
-    def scrape_country_info(self, url: str) -> Dict[str, str]:
+    def scrape_country_info(self, url: str) -> Dict[str, Any]:
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            infobox = soup.find('table', class_='infobox')
-
-            if not infobox:
-                return {"error": "Infobox not found"}
-
-            parser = WikiInfoboxParser(infobox)
-            country_info = {
-                'Capital Name': parser.extract_capital(),
-                'Timezone': parser.extract_timezone(),
-                'Government': parser.extract_government(),
-                'Area': parser.extract_area(),
-                'Spoken Language': parser.extract_spoken_language(),
-                'Density': parser.extract_density()
-            }
-
-            return {k: v for k, v in country_info.items() if v is not None}
+            return parse_country_html(self.fetch_html(url))
 
         except requests.RequestException as e:
             return {"error": f"Request failed: {str(e)}"}
@@ -0,0 +1,148 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_PATH = 'data/http_cache.db'
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheMissError(requests.RequestException):
+    pass
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    headers: Dict[str, str]
+    body: bytes
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if etag := self.headers.get('ETag'):
+            headers['If-None-Match'] = etag
+        if last_modified := self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.body
+        return response
+
+
+class ResponseCache:
+    """SQLite-backed store of compressed response bodies keyed by URL.
+
+    Entries younger than ``ttl`` are served without touching the network,
+    older ones are revalidated with their ETag / Last-Modified. Once the
+    stored bodies exceed ``max_bytes`` the least recently used entries are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            headers TEXT,
+            body BLOB,
+            size INTEGER,
+            fetched_at REAL,
+            accessed_at REAL
+        )''')
+        self._conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed_at
+        ON responses (accessed_at)''')
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT headers, body, fetched_at FROM responses '
+                'WHERE url = ?', (url,)
+            ).fetchone()
+            if not row:
+                return None
+
+            self._conn.execute(
+                'UPDATE responses SET accessed_at = ? WHERE url = ?',
+                (time.time(), url)
+            )
+            self._conn.commit()
+
+        headers, body, fetched_at = row
+        return CachedResponse(
+            url, json.loads(headers), zlib.decompress(body), fetched_at)
+
+    def store(self, url: str, response: requests.Response):
+        headers = {
+            name: response.headers[name]
+            for name in STORED_HEADERS if name in response.headers
+        }
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('''
+            INSERT OR REPLACE INTO responses
+                (url, headers, body, size, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, json.dumps(headers), body, len(body), now, now))
+            self._evict()
+            self._conn.commit()
+
+    def mark_revalidated(self, url: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET fetched_at = ?, accessed_at = ? '
+                'WHERE url = ?', (now, now, url)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            'SELECT url, size FROM responses ORDER BY accessed_at')
+        stale = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE url = ?', stale)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
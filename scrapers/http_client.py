@@ -0,0 +1,147 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.http_cache import CacheMissError, ResponseCache
+from scrapers.rate_limiter import HostRateLimiter
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = (5.0, 30.0)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Serve everything from the response cache and never hit the network.
+CACHE_ONLY = os.environ.get('SCRAPER_CACHE_ONLY') == '1'
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    """Pooled keep-alive session with retries shared by all scrapers."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = 4,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_only: bool = CACHE_ONLY
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.cache_only = cache_only
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: a random delay up to the exponential cap.
+        cap = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        if params := kwargs.pop('params', None):
+            url = requests.Request('GET', url, params=params).prepare().url
+
+        if not self.cache:
+            return self._fetch(url, **kwargs)
+
+        cached = self.cache.get(url)
+        if cached and (self.cache_only or cached.is_fresh(self.cache.ttl)):
+            return cached.to_response()
+        if self.cache_only:
+            raise CacheMissError(f"{url} is not in the response cache")
+
+        if cached:
+            kwargs['headers'] = {
+                **(kwargs.get('headers') or {}),
+                **cached.conditional_headers()
+            }
+
+        response = self._fetch(url, **kwargs)
+        if response.status_code == 304 and cached:
+            self.cache.mark_revalidated(url)
+            return cached.to_response()
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def _fetch(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.wait(url)
+
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if (response.status_code not in RETRY_STATUSES
+                    or attempt == self.max_retries):
+                return response
+
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            response.close()
+            time.sleep(min(delay, self.max_backoff))
+
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(cache=ResponseCache())
+        return _default_client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
@@ -1,8 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 from urllib.parse import urljoin
 
+from scrapers import http_client
+
 BASE_URL = "https://en.wikipedia.org"
 
 URL = (
@@ -11,7 +12,7 @@ URL = (
 )
 
 
-response = requests.get(URL)
+response = http_client.get(URL)
 soup = BeautifulSoup(response.content, 'html.parser')
 
 table = soup.find('table', {'class': 'wikitable'})
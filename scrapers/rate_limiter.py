@@ -0,0 +1,28 @@
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host across all worker threads."""
+
+    def __init__(self, requests_per_second: float = 5.0):
+        self.interval = (
+            1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        )
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
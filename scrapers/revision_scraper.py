@@ -0,0 +1,71 @@
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+from scrapers.http_client import HttpClient
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+MAX_TITLES_PER_REQUEST = 50
+
+
+def title_from_link(link: str) -> str:
+    return unquote(link.rsplit('/wiki/', 1)[-1]).replace('_', ' ')
+
+
+def _fetch_batch(client: HttpClient, titles: List[str]) -> Dict[str, int]:
+    response = client.get(API_URL, params={
+        'action': 'query',
+        'prop': 'revisions',
+        'rvprop': 'ids',
+        'redirects': 1,
+        'format': 'json',
+        'formatversion': 2,
+        'titles': '|'.join(titles)
+    })
+    response.raise_for_status()
+    query = response.json().get('query', {})
+
+    # Map every requested title to the title the API finally resolved it to.
+    resolved = {title: title for title in titles}
+    for step in ('normalized', 'redirects'):
+        renames = {r['from']: r['to'] for r in query.get(step, [])}
+        resolved = {
+            title: renames.get(target, target)
+            for title, target in resolved.items()
+        }
+
+    revisions = {
+        page['title']: page['revisions'][0]['revid']
+        for page in query.get('pages', []) if page.get('revisions')
+    }
+    return {
+        title: revisions[target]
+        for title, target in resolved.items() if target in revisions
+    }
+
+
+def fetch_revisions(
+    links: List[str],
+    client: Optional[HttpClient] = None
+) -> Dict[str, int]:
+    """Return the latest revision id of each article, keyed by its link.
+
+    Articles are looked up in batches of 50 titles per API request. Links
+    whose revision could not be determined are left out of the result.
+    """
+    # Revision lookups must always be live, so no response cache here.
+    client = client or HttpClient()
+    titles = {title_from_link(link): link for link in links}
+    title_list = list(titles)
+
+    revisions = {}
+    for start in range(0, len(title_list), MAX_TITLES_PER_REQUEST):
+        batch = title_list[start:start + MAX_TITLES_PER_REQUEST]
+        try:
+            found = _fetch_batch(client, batch)
+        except Exception as e:
+            print(f"Failed to fetch revisions for {len(batch)} pages: {e}")
+            continue
+        for title, revision_id in found.items():
+            revisions[titles[title]] = revision_id
+
+    return revisions
@@ -0,0 +1,111 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+
+from scrapers.country_info_scraper import CountryScraper, parse_country_html
+
+Page = Tuple[int, Union[str, Dict[str, str]]]
+# How often a fetcher blocked on a full queue checks whether to give up.
+PUT_POLL_SECONDS = 0.1
+
+
+def _fetch_into(
+    scraper: CountryScraper,
+    index: int,
+    url: str,
+    pages: "queue.Queue[Page]",
+    stop: threading.Event
+):
+    if stop.is_set():
+        return
+    try:
+        page = scraper.fetch_html(url)
+    except requests.RequestException as e:
+        page = {"error": f"Request failed: {str(e)}"}
+    except Exception as e:
+        page = {"error": f"An error occurred: {str(e)}"}
+    # Blocks while the parsers are behind, which throttles the fetchers,
+    # but gives up once the pipeline has stopped reading the queue.
+    while not stop.is_set():
+        try:
+            pages.put((index, page), timeout=PUT_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _parse_result(future: Future) -> Dict[str, str]:
+    try:
+        return future.result()
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+
+def scrape_pipelined(
+    scraper: CountryScraper,
+    urls: List[str],
+    fetch_workers: int = 8,
+    parse_processes: Optional[int] = None,
+    queue_size: int = 32
+) -> Iterator[Dict[str, str]]:
+    """Fetch pages on threads and parse them on a pool of processes.
+
+    Raw HTML flows from the fetcher threads through a bounded queue into a
+    ProcessPoolExecutor, so parsing is not serialised by the GIL. At most
+    ``queue_size`` pages wait to be parsed and at most twice the number of
+    processes are being parsed at any time. Results are yielded in the
+    order of ``urls`` as soon as they are ready; only results that finish
+    ahead of an earlier one are held back.
+    """
+    processes = parse_processes or os.cpu_count() or 1
+    pages: "queue.Queue[Page]" = queue.Queue(maxsize=queue_size)
+    # Results not yet yielded, by index: finished ones and running parses.
+    finished: Dict[int, Dict[str, str]] = {}
+    parsing: Dict[int, Future] = {}
+    next_index = 0
+    stop = threading.Event()
+
+    def ready(block: bool) -> Iterator[Dict[str, str]]:
+        nonlocal next_index
+        while next_index < len(urls):
+            if next_index in finished:
+                yield finished.pop(next_index)
+            elif next_index in parsing and (
+                    block or parsing[next_index].done()):
+                yield _parse_result(parsing.pop(next_index))
+            else:
+                return
+            next_index += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as fetchers, \
+            ProcessPoolExecutor(max_workers=processes) as parsers:
+        in_flight = threading.BoundedSemaphore(2 * processes)
+        try:
+            for index, url in enumerate(urls):
+                fetchers.submit(_fetch_into, scraper, index, url, pages, stop)
+
+            for _ in urls:
+                index, page = pages.get()
+                if isinstance(page, dict):
+                    finished[index] = page
+                else:
+                    in_flight.acquire()
+                    future = parsers.submit(parse_country_html, page)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    parsing[index] = future
+                yield from ready(block=False)
+
+            # Every page has arrived; wait for the parses still running.
+            yield from ready(block=True)
+        finally:
+            # On an error, or if the caller stops early, release fetchers
+            # blocked on the full queue and drop queued work so leaving the
+            # executors does not hang.
+            stop.set()
+            fetchers.shutdown(wait=False, cancel_futures=True)
+            for future in parsing.values():
+                future.cancel()
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Tuple
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cached(method: Callable) -> Callable:
+    """Memoise a service method on its name and arguments.
+
+    The owning object provides ``_cached_call(key, compute)``, which decides
+    where results live and when they become stale.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self._cached_call(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,228 @@
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, column, func, select, table, text
+
+from data.models import (
+    Country, CountryLanguage, CountryRegime, CountryUtcOffset, Neighbor
+)
+from data.normalize import REGIME_MAPPING, normalize_language, parse_utc_offset
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+COUNTRY_FIELDS = (
+    'id', 'name', 'population', 'capital', 'timezone', 'government', 'area',
+    'spoken_language', 'density'
+)
+
+
+def resolve_fields(fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    """Validate a projection; ``id`` is always kept for keyset pagination."""
+    if not fields:
+        return COUNTRY_FIELDS
+
+    unknown = [f for f in fields if f not in COUNTRY_FIELDS]
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(unknown)}")
+    return ('id',) + tuple(dict.fromkeys(f for f in fields if f != 'id'))
+
+
+def utc_offset(name: str, value: str) -> int:
+    """Offset in minutes for a parameter such as 'UTC+2' or '+5:30'."""
+    minutes = parse_utc_offset(value)
+    if minutes is None:
+        raise InvalidQuery(f"{name} must be a UTC offset such as UTC+2.")
+    return minutes
+
+
+def utc_offset_condition(low: Optional[int], high: Optional[int]):
+    """Countries with an offset in [low, high]; either bound may be open."""
+    offsets = select(CountryUtcOffset.country_id)
+    if low is not None and low == high:
+        offsets = offsets.where(CountryUtcOffset.offset_minutes == low)
+    else:
+        if low is not None:
+            offsets = offsets.where(CountryUtcOffset.offset_minutes >= low)
+        if high is not None:
+            offsets = offsets.where(CountryUtcOffset.offset_minutes <= high)
+    return Country.id.in_(offsets)
+
+
+def regime_condition(regime: str):
+    return Country.id.in_(
+        select(CountryRegime.country_id)
+        .where(CountryRegime.regime == regime))
+
+
+def neighbors_count_condition(count: int):
+    """Countries with at least ``count`` rows in the neighbors table.
+
+    Every listed border counts, including names that match no country.
+    """
+    if count <= 0:
+        return None
+    return Country.id.in_(
+        select(Neighbor.country_id)
+        .group_by(Neighbor.country_id)
+        .having(func.count() >= count))
+
+
+countries_fts = table('countries_fts', column('rowid'))
+# bm25 weights for name, capital, spoken_language and government.
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+_SEARCH_TERM = re.compile(r'\w+')
+
+
+def search_expression(q: str) -> str:
+    """An FTS5 query matching every word of ``q`` as a prefix."""
+    terms = _SEARCH_TERM.findall(q)
+    if not terms:
+        raise InvalidQuery("Search query must contain a word.")
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def compile_search(
+    q: str,
+    fields: Optional[Sequence[str]],
+    limit: int
+) -> Select:
+    """Best matches for ``q`` first, looked up in the FTS5 index."""
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    return select(*(getattr(Country, f) for f in resolve_fields(fields)))\
+        .join(countries_fts, countries_fts.c.rowid == Country.id)\
+        .where(text('countries_fts MATCH :match')
+               .bindparams(match=search_expression(q)))\
+        .order_by(text(f'bm25(countries_fts, {weights})'), Country.id)\
+        .limit(limit)
+
+
+RANGE_COLUMNS = {
+    'population': Country.population,
+    'area': Country.area,
+    'density': Country.density,
+}
+SORT_COLUMNS = {
+    'id': Country.id,
+    'name': Country.name,
+    **RANGE_COLUMNS,
+}
+QUERY_PARAMS = (
+    {f'{column}_{bound}' for column in RANGE_COLUMNS
+     for bound in ('min', 'max')}
+    | {'language', 'timezone', 'timezone_min', 'timezone_max', 'regime',
+       'sort', 'limit', 'fields'}
+)
+
+
+@dataclass(frozen=True)
+class CountryQuery:
+    """A validated filter expression; hashable so results can be cached."""
+    ranges: Tuple[Tuple[str, str, float], ...] = ()
+    language: Optional[str] = None
+    utc_offsets: Optional[Tuple[Optional[int], Optional[int]]] = None
+    regime: Optional[str] = None
+    sort: Tuple[Tuple[str, bool], ...] = ()
+    limit: int = 10
+    fields: Optional[Tuple[str, ...]] = None
+
+
+def _number(name: str, value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise InvalidQuery(f"{name} must be a number.") from None
+
+
+def _sort_keys(value: str) -> Tuple[Tuple[str, bool], ...]:
+    keys = []
+    for key in filter(None, (k.strip() for k in value.split(','))):
+        descending = key.startswith('-')
+        column = key.lstrip('+-')
+        if column not in SORT_COLUMNS:
+            raise InvalidQuery(
+                f"Cannot sort by {column}; use one of "
+                f"{', '.join(SORT_COLUMNS)}.")
+        keys.append((column, descending))
+    return tuple(keys)
+
+
+def parse_query(params: Mapping[str, str], max_limit: int) -> CountryQuery:
+    unknown = sorted(set(params) - QUERY_PARAMS)
+    if unknown:
+        raise InvalidQuery(f"Unknown query parameters: {', '.join(unknown)}")
+
+    ranges = []
+    for column in RANGE_COLUMNS:
+        for bound in ('min', 'max'):
+            name = f'{column}_{bound}'
+            if params.get(name):
+                ranges.append((column, bound, _number(name, params[name])))
+
+    utc_offsets = None
+    if params.get('timezone'):
+        exact = utc_offset('timezone', params['timezone'])
+        utc_offsets = (exact, exact)
+    elif params.get('timezone_min') or params.get('timezone_max'):
+        utc_offsets = tuple(
+            utc_offset(name, params[name]) if params.get(name) else None
+            for name in ('timezone_min', 'timezone_max'))
+
+    regime = params.get('regime')
+    if regime and regime not in REGIME_MAPPING:
+        raise InvalidQuery("Invalid regime type.")
+
+    limit = params.get('limit', '10')
+    if not limit.isdigit() or not 1 <= int(limit) <= max_limit:
+        raise InvalidQuery(
+            f"Limit must be an integer between 1 and {max_limit}.")
+
+    fields = params.get('fields')
+    if fields:
+        fields = tuple(f.strip() for f in fields.split(',') if f.strip())
+        resolve_fields(fields)
+
+    return CountryQuery(
+        ranges=tuple(ranges),
+        language=params.get('language') or None,
+        utc_offsets=utc_offsets,
+        regime=regime or None,
+        sort=_sort_keys(params.get('sort', '')),
+        limit=int(limit),
+        fields=fields or None
+    )
+
+
+def compile_query(query: CountryQuery) -> Select:
+    """Turn a CountryQuery into a single SELECT over indexed columns."""
+    fields = resolve_fields(query.fields)
+    conditions = []
+
+    for column, bound, value in query.ranges:
+        if bound == 'min':
+            conditions.append(RANGE_COLUMNS[column] >= value)
+        else:
+            conditions.append(RANGE_COLUMNS[column] <= value)
+
+    if query.language:
+        conditions.append(Country.id.in_(
+            select(CountryLanguage.country_id).where(
+                CountryLanguage.language == normalize_language(query.language))
+        ))
+    if query.utc_offsets:
+        conditions.append(utc_offset_condition(*query.utc_offsets))
+    if query.regime:
+        conditions.append(regime_condition(query.regime))
+
+    order_by = [
+        SORT_COLUMNS[column].desc() if descending else SORT_COLUMNS[column]
+        for column, descending in query.sort
+    ]
+
+    statement = select(*(getattr(Country, f) for f in fields))
+    if conditions:
+        statement = statement.where(and_(*conditions))
+    return statement.order_by(*order_by, Country.id).limit(query.limit)
@@ -1,64 +1,441 @@
-from typing import List
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from data.models import Country
-from sqlalchemy import or_
+import threading
+import time
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+from sqlalchemy import Engine, and_, select, text
+from sqlalchemy.orm import Session, sessionmaker
+from data.models import (
+    Country, CountryAlias, CountryLanguage, CountryRanking, Neighbor
+)
+from data.normalize import normalize_language
+from services.cache import LRUCache, cached
+from services.country_query import (
+    CountryQuery, compile_query, compile_search, neighbors_count_condition,
+    regime_condition, resolve_fields, utc_offset_condition
+)
+from services.country_snapshot import CountrySnapshot
+from services.db import DEFAULT_DB_URL, create_read_engine
+from services.country_stats import StatsQuery, aggregate, compile_stats_pairs
+from services.neighbor_graph import NeighborGraph
 
 
 class CountryService:
-    def __init__(self, db_url: str = 'sqlite:///countries.db'):
-        self.engine = create_engine(db_url)
+    def __init__(
+        self,
+        db_url: str = DEFAULT_DB_URL,
+        cache_size: int = 256,
+        version_check_interval: float = 1.0,
+        engine: Optional[Engine] = None
+    ):
+        self.engine = engine or create_read_engine(db_url)
+        self._sessions = sessionmaker(self.engine)
+        self.cache = LRUCache(cache_size)
+        self.version_check_interval = version_check_interval
+        self._dataset_version = None
+        self._version_checked_at = 0.0
+        self._version_lock = threading.Lock()
+        self._graph = None
+        self._graph_lock = threading.Lock()
 
     def _get_session(self) -> Session:
-        return Session(self.engine)
+        return self._sessions()
 
-    def get_all_countries(self) -> List[Country]:
-        with self._get_session() as session:
-            countries = session.query(Country).all()
-            return [c.to_dict() for c in countries]
+    def dataset_version(self) -> int:
+        """Version stamped by the loader, re-read at most once per interval.
+
+        The cache is dropped whenever the version changes.
+        """
+        now = time.monotonic()
+        if (self._dataset_version is not None and
+                now - self._version_checked_at < self.version_check_interval):
+            return self._dataset_version
+
+        with self._version_lock:
+            with self.engine.connect() as connection:
+                version = connection.execute(
+                    text('PRAGMA user_version')).scalar()
+            if version != self._dataset_version:
+                self.cache.clear()
+                self._dataset_version = version
+            self._version_checked_at = now
+            return version
+
+    def _cached_call(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        # Keying on the version keeps a result computed while a reload was
+        # committing from being served once the new version is seen.
+        key = (self.dataset_version(), key)
+        hit, value = self.cache.get(key)
+        if not hit:
+            value = compute()
+            self.cache.set(key, value)
+        return value
+
+    def _select(
+        self,
+        session: Session,
+        fields: Optional[Sequence[str]] = None,
+        condition: Any = None,
+        order_by: Any = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """Run one SELECT over the requested columns only.
+
+        Without an explicit ``order_by`` rows come in id order, and ``after``
+        continues a keyset-paginated listing from the last id seen.
+        """
+        fields = resolve_fields(fields)
+        query = session.query(*(getattr(Country, f) for f in fields))
+
+        if condition is not None:
+            query = query.filter(condition)
+        if after is not None:
+            query = query.filter(Country.id > after)
+        query = query.order_by(
+            order_by if order_by is not None else Country.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [dict(zip(fields, row)) for row in query]
 
-    def get_top_by_population(self, limit: int = 10) -> List[Country]:
+    def neighbor_graph(self) -> NeighborGraph:
+        """Adjacency index of the current dataset, rebuilt after reloads."""
+        version = self.dataset_version()
+        with self._graph_lock:
+            if self._graph is None or self._graph[0] != version:
+                self._graph = (version, self._build_neighbor_graph())
+            return self._graph[1]
+
+    def _build_neighbor_graph(self) -> NeighborGraph:
         with self._get_session() as session:
-            countries = session.query(Country)\
-                .order_by(Country.population.desc())\
-                .limit(limit)\
+            countries = session.query(Country.id, Country.name).all()
+            edges = session.query(Neighbor.country_id, Neighbor.neighbor_id)\
+                .filter(Neighbor.neighbor_id.isnot(None))\
                 .all()
-            return [c.to_dict() for c in countries]
+            aliases = session.query(
+                CountryAlias.alias, CountryAlias.country_id).all()
+        return NeighborGraph.build(countries, edges, aliases)
+
+    def resolve_country_id(self, name: str) -> Optional[int]:
+        """The one name lookup every by-name route goes through.
 
-    def get_top_by_density(self, limit: int = 10) -> List[Country]:
+        Matches the normalised name or any spelling in country_aliases, so
+        'china' finds "People's Republic of China".
+        """
+        return self.neighbor_graph().id_for(name) if name else None
+
+    @cached
+    def get_all_countries(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Country]:
         with self._get_session() as session:
-            countries = session.query(Country)\
-                .order_by(Country.density.desc())\
-                .limit(limit)\
-                .all()
-            return [c.to_dict() for c in countries]
+            return self._select(session, fields, after=after, limit=limit)
 
-    def get_by_timezone(self, timezone: str) -> List[Country]:
+    def _top(
+        self,
+        metric: str,
+        limit: int,
+        fields: Optional[Sequence[str]]
+    ) -> List[dict]:
+        """The first ``limit`` entries of a ranking built by the loader."""
         with self._get_session() as session:
-            timezone_condition = or_(
-                Country.timezone.like(f"%UTC{timezone}%"),
-                Country.timezone.like(f"%{timezone}%")
+            return self._select(
+                session, fields,
+                condition=and_(
+                    CountryRanking.metric == metric,
+                    CountryRanking.rank <= limit,
+                    CountryRanking.country_id == Country.id
+                ),
+                order_by=CountryRanking.rank
             )
 
-            countries = session.query(Country).filter(timezone_condition).all()
+    @cached
+    def get_top_by_population(
+        self,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        return self._top('population', limit, fields)
 
-            return [c.to_dict() for c in countries]
+    @cached
+    def get_top_by_density(
+        self,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        return self._top('density', limit, fields)
+
+    @cached
+    def get_top_by_area(
+        self,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        return self._top('area', limit, fields)
+
+    @cached
+    def get_rank(self, name: str) -> Optional[dict]:
+        """A country's place in each ranking; any known spelling works."""
+        country_id = self.resolve_country_id(name)
+        if country_id is None:
+            return None
 
-    def get_by_language(self, language: str) -> List[Country]:
         with self._get_session() as session:
-            countries = session.query(Country)\
-                .filter(Country.spoken_language.like(f'%{language}%'))\
-                .all()
-            return [c.to_dict() for c in countries]
+            country = session.query(Country.id, Country.name)\
+                .filter(Country.id == country_id)\
+                .first()
+            if country is None:
+                return None
 
-    def get_by_regime(self, regime: str) -> List[Country]:
+            ranks = session.query(CountryRanking.metric, CountryRanking.rank)\
+                .filter(CountryRanking.country_id == country.id)
+            return {
+                "id": country.id,
+                "name": country.name,
+                "ranks": dict(ranks.all()),
+                "out_of": session.query(Country).count()
+            }
+
+    @cached
+    def get_by_utc_offset(
+        self,
+        low: Optional[int],
+        high: Optional[int],
+        fields: Optional[Sequence[str]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Country]:
+        """Countries observing an offset, in minutes, between low and high.
+
+        Pass the same value twice for an exact match.
+        """
         with self._get_session() as session:
-            countries = session.query(Country)\
-                .filter(Country.government.like(f'%{regime}%'))\
-                .all()
-            return [c.to_dict() for c in countries]
+            return self._select(
+                session, fields,
+                condition=utc_offset_condition(low, high),
+                after=after,
+                limit=limit
+            )
+
+    @cached
+    def get_by_language(
+        self,
+        language: str,
+        fields: Optional[Sequence[str]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Country]:
+        with self._get_session() as session:
+            country_ids = select(CountryLanguage.country_id)\
+                .where(CountryLanguage.language == normalize_language(language))
+            return self._select(
+                session, fields,
+                condition=Country.id.in_(country_ids),
+                after=after,
+                limit=limit
+            )
+
+    @cached
+    def get_by_regime(
+        self,
+        regime: str,
+        fields: Optional[Sequence[str]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Country]:
+        with self._get_session() as session:
+            return self._select(
+                session, fields,
+                condition=regime_condition(regime),
+                after=after,
+                limit=limit
+            )
+
+    @cached
+    def get_by_neighbors_count(
+        self,
+        count: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Country]:
+        with self._get_session() as session:
+            return self._select(
+                session, fields, condition=neighbors_count_condition(count))
+
+    @cached
+    def query(self, country_query: CountryQuery) -> List[dict]:
+        with self._get_session() as session:
+            return self._run_query(session, country_query)
+
+    def _run_query(
+        self,
+        session: Session,
+        country_query: CountryQuery
+    ) -> List[dict]:
+        fields = resolve_fields(country_query.fields)
+        rows = session.execute(compile_query(country_query))
+        return [dict(zip(fields, row)) for row in rows]
+
+    @cached
+    def search(
+        self,
+        q: str,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        fields = resolve_fields(fields)
+        with self._get_session() as session:
+            rows = session.execute(compile_search(q, fields, limit))
+            return [dict(zip(fields, row)) for row in rows]
+
+    @cached
+    def get_stats(self, stats_query: StatsQuery) -> dict:
+        with self._get_session() as session:
+            pairs = session.execute(compile_stats_pairs(stats_query)).all()
+        return aggregate(pairs, stats_query)
+
+    @cached
+    def get_by_name(
+        self,
+        name: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        country_id = self.resolve_country_id(name)
+        if country_id is None:
+            return None
 
-    def get_by_neighbors_count(self, count: int) -> List[Country]:
         with self._get_session() as session:
-            tari = session.query(Country).all()
-            return [c.to_dict() for c in tari if len(c.neighbors) >= count]
+            countries = self._select(
+                session, fields, condition=Country.id == country_id)
+            return countries[0] if countries else None
+
+    def batch(
+        self,
+        names: Sequence[str],
+        queries: Sequence[CountryQuery],
+        fields: Optional[Sequence[str]] = None
+    ) -> dict:
+        """Resolve many names and queries over a single session.
+
+        ``countries`` follows the order of ``names`` with None for unknown
+        names, and ``queries`` holds one result list per query.
+        """
+        country_ids = [self.resolve_country_id(name) for name in names]
+        with self._get_session() as session:
+            found = {}
+            if names:
+                # resolve_fields keeps the id, which lines rows up with names.
+                found = {
+                    country['id']: country
+                    for country in self._select(
+                        session, fields,
+                        condition=Country.id.in_(set(country_ids)))
+                }
+
+            return {
+                "countries": [found.get(country_id)
+                              for country_id in country_ids],
+                "queries": [
+                    self._run_query(session, country_query)
+                    for country_query in queries
+                ]
+            }
+
+
+class SnapshotCountryService(CountryService):
+    """Serves reads from an in-memory CountrySnapshot instead of SQLite.
+
+    The snapshot is loaded on first use and replaced as a whole once the
+    dataset version changes, so a request always sees one consistent
+    dataset. Full-text search still goes to SQLite, and names are resolved
+    through the neighbor graph, which is built from SQLite once per
+    dataset version.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+
+    def snapshot(self) -> CountrySnapshot:
+        version = self.dataset_version()
+        current = self._snapshot
+        if current is not None and current[0] == version:
+            return current[1]
+
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot[0] != version:
+                with self._get_session() as session:
+                    self._snapshot = (version, CountrySnapshot.load(session))
+            return self._snapshot[1]
+
+    def get_all_countries(self, fields=None, after=None, limit=None):
+        return self.snapshot().page(None, fields, after, limit)
+
+    def get_top_by_population(self, limit=10, fields=None):
+        return self.snapshot().top('population', limit, fields)
+
+    def get_top_by_density(self, limit=10, fields=None):
+        return self.snapshot().top('density', limit, fields)
+
+    def get_top_by_area(self, limit=10, fields=None):
+        return self.snapshot().top('area', limit, fields)
+
+    def get_rank(self, name):
+        snapshot = self.snapshot()
+        row = snapshot.row_for_id(self.resolve_country_id(name))
+        if row is None:
+            return None
+        return {
+            "id": snapshot.ids[row],
+            "name": snapshot.columns['name'][row],
+            "ranks": snapshot.ranks(row),
+            "out_of": len(snapshot)
+        }
+
+    def get_by_utc_offset(self, low, high, fields=None, after=None,
+                          limit=None):
+        snapshot = self.snapshot()
+        return snapshot.page(
+            snapshot.utc_offset_rows(low, high), fields, after, limit)
+
+    def get_by_language(self, language, fields=None, after=None, limit=None):
+        snapshot = self.snapshot()
+        return snapshot.page(
+            snapshot.language_rows(language), fields, after, limit)
+
+    def get_by_regime(self, regime, fields=None, after=None, limit=None):
+        snapshot = self.snapshot()
+        return snapshot.page(
+            snapshot.regime_rows(regime), fields, after, limit)
+
+    def get_by_neighbors_count(self, count, fields=None):
+        snapshot = self.snapshot()
+        return snapshot.rows(snapshot.neighbors_count_rows(count), fields)
+
+    def query(self, country_query):
+        return self.snapshot().query(country_query)
+
+    @cached
+    def get_stats(self, stats_query):
+        snapshot = self.snapshot()
+        values = snapshot.columns[stats_query.metric]
+        return aggregate(
+            ((key, values[row])
+             for key, row in snapshot.group_rows(stats_query.group_by)),
+            stats_query
+        )
+
+    def get_by_name(self, name, fields=None):
+        return self.snapshot().by_id(self.resolve_country_id(name), fields)
+
+    def batch(self, names, queries, fields=None):
+        snapshot = self.snapshot()
+        return {
+            "countries": [
+                snapshot.by_id(self.resolve_country_id(name), fields)
+                for name in names
+            ],
+            "queries": [snapshot.query(query) for query in queries]
+        }
@@ -0,0 +1,251 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import (
+    Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from data.models import (
+    Country, CountryLanguage, CountryRegime, CountryUtcOffset, Neighbor
+)
+from data.normalize import normalize_language
+from services.country_query import (
+    COUNTRY_FIELDS, RANGE_COLUMNS, CountryQuery, resolve_fields
+)
+from services.country_stats import UNGROUPED
+
+# array typecodes of the numeric columns; the rest are interned strings.
+NUMERIC_COLUMNS = {
+    'id': 'q',
+    'population': 'q',
+    'area': 'd',
+    'density': 'd',
+}
+
+
+class CountrySnapshot:
+    """Immutable, column-oriented copy of the countries table.
+
+    Row ``i`` of every column is the country with the i-th smallest id, so
+    id order, keyset pagination and id lookups need no sorting. Numeric
+    columns are ``array`` objects, text columns tuples of interned strings,
+    and the language, UTC offset and regime tables become row indexes.
+    ``neighbor_counts[i]`` is the number of neighbors rows of row i.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Sequence],
+        languages: Dict[str, array],
+        utc_offsets: Sequence[Tuple[int, int]],
+        regimes: Dict[str, array],
+        neighbor_counts: array
+    ):
+        self.columns = columns
+        self.ids = columns['id']
+        self.languages = languages
+        self.regimes = regimes
+        self.neighbor_counts = neighbor_counts
+        # (offset, row) pairs sorted by offset, for bisecting ranges.
+        self._offset_keys = array('q', (offset for offset, _ in utc_offsets))
+        self._offset_rows = array('i', (row for _, row in utc_offsets))
+        # Descending orders, ties broken by id as in the SQL queries.
+        self._descending = {
+            column: array('i', sorted(
+                range(len(self.ids)), key=lambda row: -columns[column][row]))
+            for column in RANGE_COLUMNS
+        }
+        # 1-based place of every row in each descending order.
+        self._ranks = {}
+        for column, order in self._descending.items():
+            ranks = array('i', [0] * len(order))
+            for rank, row in enumerate(order, 1):
+                ranks[row] = rank
+            self._ranks[column] = ranks
+
+    @classmethod
+    def load(cls, session: Session) -> "CountrySnapshot":
+        rows = session.query(*(getattr(Country, f) for f in COUNTRY_FIELDS))\
+            .order_by(Country.id)\
+            .all()
+        columns = {}
+        for position, field in enumerate(COUNTRY_FIELDS):
+            values = (row[position] for row in rows)
+            if field in NUMERIC_COLUMNS:
+                columns[field] = array(NUMERIC_COLUMNS[field], values)
+            else:
+                columns[field] = tuple(
+                    sys.intern(value) if value is not None else None
+                    for value in values)
+
+        row_for_id = {country_id: row
+                      for row, country_id in enumerate(columns['id'])}
+
+        def index(pairs: Iterable[Tuple[str, int]]) -> Dict[str, array]:
+            rows_by_key: Dict[str, List[int]] = {}
+            for key, country_id in pairs:
+                if country_id in row_for_id:
+                    rows_by_key.setdefault(sys.intern(key), []).append(
+                        row_for_id[country_id])
+            return {key: array('i', sorted(rows))
+                    for key, rows in rows_by_key.items()}
+
+        utc_offsets = sorted(
+            (offset, row_for_id[country_id])
+            for offset, country_id in session.query(
+                CountryUtcOffset.offset_minutes, CountryUtcOffset.country_id)
+            if country_id in row_for_id
+        )
+        neighbor_counts = array('i', [0] * len(rows))
+        for country_id, count in session.query(
+                Neighbor.country_id, func.count())\
+                .group_by(Neighbor.country_id):
+            if country_id in row_for_id:
+                neighbor_counts[row_for_id[country_id]] = count
+        return cls(
+            columns,
+            index(session.query(
+                CountryLanguage.language, CountryLanguage.country_id)),
+            utc_offsets,
+            index(session.query(
+                CountryRegime.regime, CountryRegime.country_id)),
+            neighbor_counts,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(
+        self,
+        selected: Iterable[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        fields = resolve_fields(fields)
+        columns = [self.columns[f] for f in fields]
+        return [
+            dict(zip(fields, [column[row] for column in columns]))
+            for row in selected
+        ]
+
+    def page(
+        self,
+        selected: Optional[Sequence[int]] = None,
+        fields: Optional[Sequence[str]] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """Rows in id order, continuing after the country id ``after``.
+
+        ``selected`` must be sorted; None means every row.
+        """
+        if selected is None:
+            selected = range(len(self.ids))
+        if after is not None:
+            first = bisect_right(self.ids, after)
+            selected = selected[bisect_left(selected, first):]
+        if limit is not None:
+            selected = selected[:limit]
+        return self.rows(selected, fields)
+
+    def top(
+        self,
+        column: str,
+        limit: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        return self.rows(self._descending[column][:limit], fields)
+
+    def row_for_id(self, country_id: Optional[int]) -> Optional[int]:
+        if country_id is None:
+            return None
+        row = bisect_left(self.ids, country_id)
+        if row == len(self.ids) or self.ids[row] != country_id:
+            return None
+        return row
+
+    def by_id(
+        self,
+        country_id: Optional[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        row = self.row_for_id(country_id)
+        return self.rows([row], fields)[0] if row is not None else None
+
+    def ranks(self, row: int) -> Dict[str, int]:
+        """Place of a row in each top-N ranking, as in country_rankings."""
+        return {column: ranks[row] for column, ranks in self._ranks.items()}
+
+    def by_ids(self, country_ids: Iterable[int]) -> List[int]:
+        wanted = set(country_ids)
+        return [row for row, country_id in enumerate(self.ids)
+                if country_id in wanted]
+
+    def language_rows(self, language: str) -> Sequence[int]:
+        return self.languages.get(normalize_language(language), ())
+
+    def regime_rows(self, regime: str) -> Sequence[int]:
+        return self.regimes.get(regime, ())
+
+    def neighbors_count_rows(self, count: int) -> List[int]:
+        return [row for row, neighbors in enumerate(self.neighbor_counts)
+                if neighbors >= count]
+
+    def utc_offset_rows(
+        self,
+        low: Optional[int],
+        high: Optional[int]
+    ) -> List[int]:
+        start = (bisect_left(self._offset_keys, low)
+                 if low is not None else 0)
+        end = (bisect_right(self._offset_keys, high)
+               if high is not None else len(self._offset_keys))
+        return sorted(set(self._offset_rows[start:end]))
+
+    def group_rows(
+        self,
+        group_by: Optional[str]
+    ) -> Iterator[Tuple[Hashable, int]]:
+        """(group key, row) pairs for a country_stats grouping."""
+        if group_by is None:
+            yield from ((UNGROUPED, row) for row in range(len(self.ids)))
+        elif group_by == 'utc_offset':
+            yield from zip(self._offset_keys, self._offset_rows)
+        else:
+            index = self.regimes if group_by == 'regime' else self.languages
+            for key, rows in index.items():
+                yield from ((key, row) for row in rows)
+
+    def query(self, country_query: CountryQuery) -> List[dict]:
+        """Evaluate a CountryQuery with the same results as compile_query."""
+        candidates: Optional[set] = None
+
+        def narrow(rows: Iterable[int]):
+            nonlocal candidates
+            rows = set(rows)
+            candidates = rows if candidates is None else candidates & rows
+
+        if country_query.language:
+            narrow(self.language_rows(country_query.language))
+        if country_query.utc_offsets:
+            narrow(self.utc_offset_rows(*country_query.utc_offsets))
+        if country_query.regime:
+            narrow(self.regime_rows(country_query.regime))
+
+        selected = (sorted(candidates) if candidates is not None
+                    else range(len(self.ids)))
+        for column, bound, value in country_query.ranges:
+            values = self.columns[column]
+            if bound == 'min':
+                selected = [row for row in selected if values[row] >= value]
+            else:
+                selected = [row for row in selected if values[row] <= value]
+
+        # Stable sorts, last key first, on top of id order.
+        selected = list(selected)
+        for column, descending in reversed(country_query.sort):
+            selected.sort(key=self.columns[column].__getitem__,
+                          reverse=descending)
+        return self.rows(selected[:country_query.limit], country_query.fields)
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from itertools import groupby
+from typing import (
+    Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+)
+
+from sqlalchemy import Select, literal, select
+
+from data.models import (
+    Country, CountryLanguage, CountryRegime, CountryUtcOffset
+)
+from data.normalize import offset_label
+from services.country_query import RANGE_COLUMNS, InvalidQuery
+
+# group_by -> (group key, country id) columns of its join table.
+GROUP_COLUMNS = {
+    'regime': (CountryRegime.regime, CountryRegime.country_id),
+    'language': (CountryLanguage.language, CountryLanguage.country_id),
+    'utc_offset': (CountryUtcOffset.offset_minutes,
+                   CountryUtcOffset.country_id),
+}
+GROUP_BY = tuple(GROUP_COLUMNS)
+UNGROUPED = 'all'
+STATS_PARAMS = {'metric', 'group_by', 'percentiles', 'bins'}
+DEFAULT_PERCENTILES = (25.0, 50.0, 75.0)
+MAX_BINS = 100
+
+
+@dataclass(frozen=True)
+class StatsQuery:
+    metric: str = 'population'
+    group_by: Optional[str] = None
+    percentiles: Tuple[float, ...] = DEFAULT_PERCENTILES
+    bins: int = 10
+
+
+def parse_stats_query(params: Mapping[str, str]) -> StatsQuery:
+    unknown = sorted(set(params) - STATS_PARAMS)
+    if unknown:
+        raise InvalidQuery(f"Unknown query parameters: {', '.join(unknown)}")
+
+    metric = params.get('metric') or 'population'
+    if metric not in RANGE_COLUMNS:
+        raise InvalidQuery(
+            f"Metric must be one of {', '.join(RANGE_COLUMNS)}.")
+
+    group_by = params.get('group_by') or None
+    if group_by and group_by not in GROUP_BY:
+        raise InvalidQuery(f"Group by must be one of {', '.join(GROUP_BY)}.")
+
+    percentiles = DEFAULT_PERCENTILES
+    if params.get('percentiles'):
+        try:
+            percentiles = tuple(
+                float(p) for p in params['percentiles'].split(',') if p)
+        except ValueError:
+            raise InvalidQuery("Percentiles must be numbers.") from None
+        if not all(0 <= p <= 100 for p in percentiles):
+            raise InvalidQuery("Percentiles must be between 0 and 100.")
+
+    bins = params.get('bins', '10')
+    if not bins.isdigit() or not 1 <= int(bins) <= MAX_BINS:
+        raise InvalidQuery(
+            f"Bins must be an integer between 1 and {MAX_BINS}.")
+
+    return StatsQuery(metric, group_by, percentiles, int(bins))
+
+
+def compile_stats_pairs(stats_query: StatsQuery) -> Select:
+    """(group key, metric value) for every country in every group."""
+    metric = RANGE_COLUMNS[stats_query.metric]
+    if stats_query.group_by is None:
+        return select(literal(UNGROUPED), metric)
+
+    key, country_id = GROUP_COLUMNS[stats_query.group_by]
+    return select(key, metric).join(Country, Country.id == country_id)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Linear interpolation between closest ranks of sorted ``values``."""
+    position = (len(values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def histogram_edges(low: float, high: float, bins: int) -> List[float]:
+    width = (high - low) / bins
+    return [low + width * i for i in range(bins)] + [high]
+
+
+def histogram(values: Sequence[float], edges: Sequence[float]) -> List[int]:
+    """Counts per bin; every bin is half-open except the last."""
+    counts = [0] * (len(edges) - 1)
+    low, high = edges[0], edges[-1]
+    width = (high - low) / len(counts)
+    for value in values:
+        if width == 0 or value >= high:
+            counts[-1] += 1
+        else:
+            # Rounding can put a value just below high past the last bin.
+            counts[min(int((value - low) / width), len(counts) - 1)] += 1
+    return counts
+
+
+def summarize(
+    values: Sequence[float],
+    stats_query: StatsQuery,
+    edges: Sequence[float]
+) -> dict:
+    """Statistics of one group; ``values`` must be sorted."""
+    total = sum(values)
+    return {
+        "count": len(values),
+        "sum": total,
+        "mean": total / len(values),
+        "min": values[0],
+        "max": values[-1],
+        "median": percentile(values, 50),
+        "percentiles": {
+            f"{p:g}": percentile(values, p) for p in stats_query.percentiles
+        },
+        "histogram": histogram(values, edges),
+    }
+
+
+def group_label(group_by: Optional[str], key: Hashable) -> Hashable:
+    if group_by == 'utc_offset':
+        return offset_label(key)
+    return key
+
+
+def aggregate(
+    pairs: Iterable[Tuple[Hashable, float]],
+    stats_query: StatsQuery
+) -> dict:
+    """Grouped statistics over (group key, metric value) pairs.
+
+    Histograms share one set of bin edges spanning every value, so groups
+    can be compared bin by bin.
+    """
+    pairs = sorted(pairs)
+    if not pairs:
+        return {"metric": stats_query.metric,
+                "group_by": stats_query.group_by,
+                "bins": [], "groups": []}
+
+    values = [value for _, value in pairs]
+    edges = histogram_edges(min(values), max(values), stats_query.bins)
+
+    groups = []
+    for key, group in groupby(pairs, key=lambda pair: pair[0]):
+        groups.append({
+            "group": group_label(stats_query.group_by, key),
+            **summarize([value for _, value in group], stats_query, edges)
+        })
+    return {
+        "metric": stats_query.metric,
+        "group_by": stats_query.group_by,
+        "bins": edges,
+        "groups": groups,
+    }
@@ -0,0 +1,48 @@
+from typing import Sequence
+
+from sqlalchemy import Engine, create_engine, event
+
+DEFAULT_DB_URL = 'sqlite:///countries.db'
+DEFAULT_POOL_SIZE = 16
+DEFAULT_MAX_OVERFLOW = 16
+DEFAULT_POOL_TIMEOUT = 5.0
+
+# Run on every new API connection. The database is in WAL mode, set by
+# the loader, so these readers keep going while a load commits.
+READ_PRAGMAS = (
+    'PRAGMA query_only = ON',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA cache_size = -32768',
+    'PRAGMA temp_store = MEMORY',
+)
+
+
+def create_read_engine(
+    db_url: str = DEFAULT_DB_URL,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_overflow: int = DEFAULT_MAX_OVERFLOW,
+    pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+    pragmas: Sequence[str] = READ_PRAGMAS
+) -> Engine:
+    """Pooled engine for the API: read-only connections shared by threads.
+
+    Connections are kept open between requests, so the page cache and the
+    memory map survive from one request to the next.
+    """
+    engine = create_engine(
+        db_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        connect_args={'check_same_thread': False}
+    )
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
@@ -0,0 +1,155 @@
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from data.normalize import normalize_country_name
+
+
+class NeighborGraph:
+    """Immutable land-border adjacency in compressed sparse row form.
+
+    Countries are numbered 0..n-1 in id order. The neighbors of node ``i``
+    are ``targets[offsets[i]:offsets[i + 1]]``, so a traversal never touches
+    the database or builds ORM objects.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        names: Sequence[str],
+        offsets: array,
+        targets: array,
+        aliases: Iterable[Tuple[str, int]] = ()
+    ):
+        self.ids = array('q', ids)
+        self.names = tuple(names)
+        self.offsets = offsets
+        self.targets = targets
+        self._index = {country_id: i for i, country_id in enumerate(ids)}
+        self._by_name = {
+            normalize_country_name(name): country_id
+            for country_id, name in zip(ids, names)
+        }
+        # country_aliases keys are already normalised, e.g. 'china'.
+        self._by_name.update(
+            (alias, country_id) for alias, country_id in aliases
+            if country_id in self._index)
+
+    @classmethod
+    def build(
+        cls,
+        countries: Iterable[Tuple[int, str]],
+        edges: Iterable[Tuple[int, int]],
+        aliases: Iterable[Tuple[str, int]] = ()
+    ) -> "NeighborGraph":
+        countries = sorted(countries)
+        ids = [country_id for country_id, _ in countries]
+        index = {country_id: i for i, country_id in enumerate(ids)}
+
+        # Land borders are symmetric even when the source lists only one
+        # direction, so store both.
+        adjacency: List[set] = [set() for _ in ids]
+        for a, b in edges:
+            if a in index and b in index and a != b:
+                adjacency[index[a]].add(index[b])
+                adjacency[index[b]].add(index[a])
+
+        offsets = array('i', [0])
+        targets = array('i')
+        for neighbors in adjacency:
+            targets.extend(sorted(neighbors))
+            offsets.append(len(targets))
+
+        return cls(ids, [name for _, name in countries], offsets, targets,
+                   aliases)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, country_id: int) -> bool:
+        return country_id in self._index
+
+    def id_for(self, name: str) -> Optional[int]:
+        """Country id for a name or any spelling in country_aliases."""
+        return self._by_name.get(normalize_country_name(name))
+
+    def _adjacent(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def _describe(self, node: int, **extra) -> dict:
+        return {"id": self.ids[node], "name": self.names[node], **extra}
+
+    def degree(self, country_id: int) -> int:
+        node = self._index[country_id]
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def degrees(self) -> List[dict]:
+        return [
+            self._describe(node, neighbors=self.offsets[node + 1] - offset)
+            for node, offset in enumerate(self.offsets[:-1])
+        ]
+
+    def neighborhood(self, country_id: int, depth: int = 1) -> List[dict]:
+        """Countries reachable within ``depth`` land borders, by distance."""
+        start = self._index[country_id]
+        distances = {start: 0}
+        frontier = deque([start])
+        while frontier:
+            node = frontier.popleft()
+            if distances[node] == depth:
+                continue
+            for neighbor in self._adjacent(node):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[node] + 1
+                    frontier.append(neighbor)
+
+        return [
+            self._describe(node, distance=distance)
+            for node, distance in sorted(
+                distances.items(), key=lambda item: (item[1], item[0]))
+            if node != start
+        ]
+
+    def shortest_path(
+        self,
+        source_id: int,
+        target_id: int
+    ) -> Optional[List[dict]]:
+        source, target = self._index[source_id], self._index[target_id]
+        previous: Dict[int, int] = {source: source}
+        frontier = deque([source])
+        while frontier and target not in previous:
+            node = frontier.popleft()
+            for neighbor in self._adjacent(node):
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    frontier.append(neighbor)
+
+        if target not in previous:
+            return None
+
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        return [self._describe(node) for node in reversed(path)]
+
+    def components(self) -> List[List[dict]]:
+        """Connected land masses, largest first; isolated countries last."""
+        seen = set()
+        components = []
+        for start in range(len(self.ids)):
+            if start in seen:
+                continue
+            seen.add(start)
+            members, frontier = [start], deque([start])
+            while frontier:
+                for neighbor in self._adjacent(frontier.popleft()):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        members.append(neighbor)
+                        frontier.append(neighbor)
+            components.append(sorted(members))
+
+        components.sort(key=lambda members: (-len(members), members[0]))
+        return [[self._describe(node) for node in members]
+                for members in components]
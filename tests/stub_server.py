@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple, Union
+
+
+class StubServer:
+    """Local HTTP server answering fixed routes and counting requests.
+
+    ``routes`` maps a path (with its query string) to a body, or to a
+    (status, body) pair. Every response is delayed by ``latency`` seconds,
+    which stands in for the round trip to Wikipedia.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Union[str, bytes, Tuple[int, Union[str, bytes]]]],
+        latency: float = 0.0
+    ):
+        self.routes = routes
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests[self.path] += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                route = stub.routes.get(self.path, (404, 'Not found'))
+                status, body = route if isinstance(route, tuple) else (
+                    200, route)
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
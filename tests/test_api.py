@@ -0,0 +1,86 @@
+import importlib
+import sys
+
+import pytest
+
+from api import app
+from services.country_service import CountryService, SnapshotCountryService
+
+ERROR_LIMIT = "Limit must be an integer between 1 and 250."
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', ['/', '/search?q=rom'])
+@pytest.mark.parametrize('limit', ['abc', '', '-1', '2.5', '0', '251'])
+def test_bad_limit_is_rejected(client, path, limit):
+    separator = '&' if '?' in path else '?'
+    response = client.get(f'/api/countries{path}{separator}limit={limit}')
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": ERROR_LIMIT}
+
+
+def test_limit_bounds_the_page(client):
+    response = client.get('/api/countries/?limit=3')
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 3
+
+
+@pytest.mark.parametrize('path', [
+    '/name/Atlantis',
+    '/rank/Atlantis',
+    '/graph/neighbors/Atlantis',
+    '/graph/path?from=Portugal&to=Atlantis',
+])
+def test_unknown_country_is_not_found(client, path):
+    response = client.get(f'/api/countries{path}')
+
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Country not found."}
+
+
+@pytest.mark.parametrize('query', ['', '?from=Portugal', '?to=China',
+                                   '?from=&to=China'])
+def test_path_needs_both_ends(client, query):
+    response = client.get(f'/api/countries/graph/path{query}')
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        "error": "From and to parameters are required."}
+
+
+@pytest.mark.parametrize('depth', ['abc', '0', '11'])
+def test_bad_depth_is_rejected(client, depth):
+    response = client.get(
+        f'/api/countries/graph/neighbors/Portugal?depth={depth}')
+
+    assert response.status_code == 400
+
+
+def test_path_resolves_aliases(client):
+    response = client.get('/api/countries/graph/path?from=Portugal&to=China')
+
+    assert response.status_code == 200
+    path = response.get_json()
+    assert path[0]['name'] == 'Portugal'
+    assert path[-1]['name'] == "People's Republic of China"
+
+
+def test_snapshot_ranks_match_the_stored_rankings():
+    sql, snapshot = CountryService(), SnapshotCountryService()
+
+    for name in ('Romania', 'china', 'Vatican City', 'Atlantis'):
+        assert snapshot.get_rank(name) == sql.get_rank(name)
+
+
+def test_asgi_without_its_dependencies_says_what_to_install(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'a2wsgi', None)
+    monkeypatch.delitem(sys.modules, 'asgi', raising=False)
+
+    with pytest.raises(ImportError, match='pip install a2wsgi uvicorn'):
+        importlib.import_module('asgi')
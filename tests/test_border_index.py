@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from data_operations import data_aggregator
+from scrapers import border_scraper, http_client
+from scrapers.http_client import HttpClient
+from tests.stub_server import StubServer
+
+NEIGHBORS = {
+    'France': ['Spain', 'Belgium'],
+    'Spain': ['France', 'Portugal'],
+    'Portugal': ['Spain'],
+    'Belgium': ['France'],
+}
+
+
+def borders_page(neighbors):
+    rows = ''.join(
+        f"<tr><td><a>{country}</a></td><td></td><td></td><td></td><td></td>"
+        f"<td>{''.join(f'<a>{n}</a>' for n in borders)}</td></tr>"
+        for country, borders in neighbors.items()
+    )
+    return (
+        '<table class="wikitable sortable"><tbody>'
+        f'<tr><th>Country</th></tr>{rows}</tbody></table>'
+    )
+
+
+def country_page(capital):
+    return (
+        '<table class="infobox"><tr><th class="infobox-label">Capital</th>'
+        f'<td class="infobox-data"><a>{capital}</a></td></tr></table>'
+    )
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    routes = {'/borders': borders_page(NEIGHBORS)}
+    routes.update({f'/wiki/{name}': country_page(f'{name} City')
+                   for name in NEIGHBORS})
+
+    with StubServer(routes) as server:
+        monkeypatch.setattr(
+            border_scraper, 'BORDERS_URL', server.url('/borders'))
+        # The borders page goes through the shared client; keep it uncached.
+        monkeypatch.setattr(http_client, '_default_client', HttpClient())
+        border_scraper.load_border_index.cache_clear()
+        yield server
+        border_scraper.load_border_index.cache_clear()
+
+
+@pytest.mark.parametrize('parse_processes', [0, 2])
+def test_borders_page_is_fetched_once_per_run(stub, parse_processes):
+    countries = [
+        {'name': name, 'population': '1', 'country_link': stub.url(
+            f'/wiki/{name}')}
+        for name in NEIGHBORS
+    ]
+    # No response cache, so every page is really requested from the stub.
+    client = HttpClient(pool_size=4)
+
+    for _ in range(2):
+        records = list(data_aggregator.iter_aggregated_countries(
+            countries,
+            workers=4,
+            parse_processes=parse_processes,
+            client=client
+        ))
+        assert {r['name']: r['neighbors'] for r in records} == NEIGHBORS
+        assert all(r['additional_info']['Capital Name'] == f"{r['name']} City"
+                   for r in records)
+
+    client.close()
+
+    assert stub.requests['/borders'] == 1
+    assert all(stub.requests[f'/wiki/{name}'] == 2 for name in NEIGHBORS)
+
+
+def test_failed_borders_fetch_is_not_cached(stub):
+    stub.routes['/borders'] = (404, 'Not found')
+    with pytest.raises(requests.HTTPError):
+        border_scraper.load_border_index()
+
+    stub.routes['/borders'] = (200, borders_page({}))
+    with pytest.raises(ValueError):
+        border_scraper.load_border_index()
+
+    stub.routes['/borders'] = borders_page(NEIGHBORS)
+    assert border_scraper.load_border_index() == NEIGHBORS
+    assert stub.requests['/borders'] == 3
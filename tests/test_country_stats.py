@@ -0,0 +1,26 @@
+import pytest
+
+from services.country_stats import histogram, histogram_edges, percentile
+
+
+def test_value_just_below_high_lands_in_the_last_bin():
+    edges = histogram_edges(0, 1, 3)
+
+    assert histogram([0.9999999999999999], edges) == [0, 0, 1]
+
+
+@pytest.mark.parametrize('values, bins, counts', [
+    ([0, 1, 2, 3, 4], 2, [2, 3]),
+    ([0, 0.5, 1], 4, [1, 0, 1, 1]),
+    ([5, 5, 5], 3, [0, 0, 3]),
+])
+def test_histogram(values, bins, counts):
+    edges = histogram_edges(min(values), max(values), bins)
+
+    assert histogram(values, edges) == counts
+    assert sum(counts) == len(values)
+
+
+@pytest.mark.parametrize('p, value', [(0, 1), (50, 2.5), (100, 4), (25, 1.75)])
+def test_percentile(p, value):
+    assert percentile([1, 2, 3, 4], p) == value
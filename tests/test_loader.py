@@ -0,0 +1,140 @@
+import sqlite3
+
+import pytest
+
+from data_operations.db_seed import import_data
+
+CHILD_TABLES = ('neighbors', 'country_languages', 'country_utc_offsets',
+                'country_revisions', 'country_aliases', 'country_regimes')
+
+
+def country(name, neighbors=(), population=1000, revision_id=1):
+    return {
+        'name': name,
+        'population': population,
+        'neighbors': list(neighbors),
+        'revision_id': revision_id,
+        'additional_info': {
+            'Capital Name': f'{name} City',
+            'Timezone': 'UTC+1',
+            'Government': 'Unitary parliamentary republic',
+            'Area': '100',
+            'Spoken Language': 'English',
+            'Density': '10',
+        },
+    }
+
+
+def snapshot(db_path):
+    """Every row of every loader table, plus the dataset version."""
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {
+            table: sorted(conn.execute(f'SELECT * FROM {table}').fetchall())
+            for table in ('countries', 'country_rankings') + CHILD_TABLES
+        }
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+    return tables, version
+
+
+def stored_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(name for name, in conn.execute(
+            'SELECT name FROM countries'))
+    finally:
+        conn.close()
+
+
+def country_ids(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {country_id for country_id, in conn.execute(
+            f'SELECT DISTINCT country_id FROM {table}')}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'countries.db')
+
+
+def test_reload_is_idempotent(db_path):
+    data = [country('Aland', ['Borduria']), country('Borduria', ['Aland'])]
+
+    assert import_data(data, db_path) == 2
+    first, first_version = snapshot(db_path)
+    assert import_data(data, db_path) == 2
+    second, second_version = snapshot(db_path)
+
+    assert first == second
+    assert second_version == first_version + 1
+    # Both neighbor rows point at the other country's id.
+    assert all(neighbor_id is not None
+               for _, _, neighbor_id in second['neighbors'])
+
+
+def test_full_refresh_keeps_countries_that_failed_to_scrape(db_path):
+    import_data([country('Aland', ['Borduria']), country('Borduria')],
+                db_path, keep_names={'Aland', 'Borduria'})
+    kept, _ = snapshot(db_path)
+
+    # Borduria's page failed, so it is missing from the data, but it is
+    # still in the source link list.
+    import_data([country('Aland', ['Borduria'])], db_path,
+                keep_names={'Aland', 'Borduria'})
+
+    assert stored_names(db_path) == ['Aland', 'Borduria']
+    assert snapshot(db_path)[0]['countries'] == kept['countries']
+
+
+def test_full_refresh_prunes_countries_gone_from_the_source(db_path):
+    import_data([country('Aland', ['Borduria']), country('Borduria')],
+                db_path, keep_names={'Aland', 'Borduria'})
+    borduria_id = dict(
+        (name, country_id) for country_id, name, *_ in
+        snapshot(db_path)[0]['countries'])['Borduria']
+
+    import_data([country('Aland', ['Borduria'])], db_path,
+                keep_names={'Aland'})
+
+    assert stored_names(db_path) == ['Aland']
+    for table in CHILD_TABLES:
+        assert borduria_id not in country_ids(db_path, table)
+
+
+def test_incremental_load_leaves_other_countries_alone(db_path):
+    import_data([country('Aland'), country('Borduria')], db_path)
+    import_data([country('Carpania')], db_path)
+
+    assert stored_names(db_path) == ['Aland', 'Borduria', 'Carpania']
+
+
+def test_failed_load_rolls_back(db_path):
+    import_data([country('Aland'), country('Borduria')], db_path)
+    before = snapshot(db_path)
+
+    def failing():
+        yield country('Aland', population=5)
+        yield country('Carpania')
+        raise RuntimeError("scrape failed")
+
+    with pytest.raises(RuntimeError):
+        import_data(failing(), db_path, keep_names={'Aland', 'Carpania'})
+
+    assert snapshot(db_path) == before
+
+
+def test_locked_database_raises_the_lock_error(db_path):
+    import_data([country('Aland')], db_path)
+    holder = sqlite3.connect(db_path, isolation_level=None, timeout=0)
+    holder.execute('BEGIN IMMEDIATE')
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            import_data([country('Borduria')], db_path)
+    finally:
+        holder.execute('ROLLBACK')
+        holder.close()
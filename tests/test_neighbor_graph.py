@@ -0,0 +1,29 @@
+from services.neighbor_graph import NeighborGraph
+
+COUNTRIES = [(1, "People's Republic of China"), (2, 'Mongolia'),
+             (3, 'Russia'), (4, 'Finland')]
+EDGES = [(1, 2), (2, 3), (3, 4)]
+ALIASES = [("people s republic of china", 1), ('china', 1),
+           ('mongolia', 2), ('russia', 3), ('finland', 4), ('suomi', 4),
+           ('atlantis', 99)]
+
+
+def test_names_resolve_through_aliases():
+    graph = NeighborGraph.build(COUNTRIES, EDGES, ALIASES)
+
+    assert graph.id_for('China') == 1
+    assert graph.id_for("people's republic of china") == 1
+    assert graph.id_for('The Suomi') == 4
+    # Aliases of countries missing from the graph are ignored.
+    assert graph.id_for('Atlantis') is None
+
+    path = graph.shortest_path(graph.id_for('china'), graph.id_for('suomi'))
+    assert [step['name'] for step in path] == [
+        "People's Republic of China", 'Mongolia', 'Russia', 'Finland']
+
+
+def test_names_resolve_without_aliases():
+    graph = NeighborGraph.build(COUNTRIES, EDGES)
+
+    assert graph.id_for('Mongolia') == 2
+    assert graph.id_for('China') is None
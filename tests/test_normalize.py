@@ -0,0 +1,102 @@
+import pytest
+
+from data.normalize import (
+    offset_label, parse_utc_offset, parse_utc_offsets, split_languages
+)
+
+
+@pytest.mark.parametrize('text, keys', [
+    (None, []),
+    ('Romanian', ['romanian']),
+    ('Dutch, French, German', ['dutch', 'french', 'german']),
+    ('Spanish Quechua Aymara Guarani Other Indigenous languages',
+     ['spanish', 'quechua', 'aymara', 'guarani']),
+    ('English, Hiri Motu, P, N, G Sign Language, Tok Pisin',
+     ['english', 'hiri motu', 'tok pisin']),
+    ('English, Māori, N, Z Sign Language', ['english', 'māori']),
+    ('Korean Korean Sign Language', ['korean', 'korean sign language']),
+    ('French · Sango', ['french', 'sango']),
+    ('Standard Chinese', ['chinese']),
+    ('None at the federal level', []),
+    ('National language:Luxembourgish Administrative languages:'
+     'Luxembourgish, German, French', ['luxembourgish', 'german', 'french']),
+    ('16 languages: Chewa, Chibarwe, Zimbabwean sign language',
+     ['chewa', 'chibarwe', 'zimbabwean sign language']),
+])
+def test_split_languages(text, keys):
+    assert split_languages(text) == keys
+
+
+def test_split_languages_keeps_only_language_names():
+    keys = split_languages(
+        '12 languages Afrikaans English Ndebele Sepedi Sesotho Setswana '
+        'South African Sign Language Swazi Tshivenda Xhosa Xitsonga Zulu '
+        'Languages with special status Khoe languages Nama, Khoisan '
+        'languages, German')
+
+    assert 'south african sign language' in keys
+    assert not {'south', 'african', 'languages', 'with', 'status'} & set(keys)
+    assert all(len(key) > 1 and not key[0].isdigit() for key in keys)
+
+
+def hours(*values):
+    return [int(value * 60) for value in values]
+
+
+# Timezone strings as they appear in the scraped infoboxes.
+@pytest.mark.parametrize('text, offsets', [
+    (None, []),
+    ('', []),
+    ('UTC', [0]),
+    ('UTC±00:00', [0]),
+    ('UTC+01:00', [60]),
+    ('UTC+2:00', [120]),
+    ('UTC+05:30', [330]),
+    ('UTC+05:45', [345]),
+    ('UTC+4:30Lunar Calendar', [270]),
+    ('UTC−05:00', [-300]),
+    ('UTC-04:00', [-240]),
+    ('UTC–3', [-180]),
+    ('UTC+8; +9.5; +10', [480, 570, 600]),
+    ('UTC+01:00 UTC−04:00', [-240, 60]),
+    # Ranges cover every whole hour between their ends.
+    ('UTC+7 to +9', hours(7, 8, 9)),
+    ('UTC+1 to +2', hours(1, 2)),
+    ('UTC−2 to −5', hours(-5, -4, -3, -2)),
+    ('UTC−8 to −5', hours(-8, -7, -6, -5)),
+    ('UTC+2 to +12', hours(*range(2, 13))),
+    # The second sign is left out and means the first one.
+    ('UTC−4 to −12, +10, +11', hours(*range(-12, -3), 10, 11)),
+    ('UTC\u2060±0 to +1', [0, 60]),
+    ('UTC−3.5 to −8', hours(-8, -7, -6, -5, -4, -3.5)),
+])
+def test_parse_utc_offsets(text, offsets):
+    assert parse_utc_offsets(text) == offsets
+
+
+@pytest.mark.parametrize('value, offset', [
+    ('UTC+2', 120),
+    ('utc-5', -300),
+    ('UTC', 0),
+    ('+5:30', 330),
+    ('UTC-3.5', -210),
+    ('UTC±0', 0),
+    # A '+' in a query string arrives as a space.
+    ('UTC 2', 120),
+    ('2', 120),
+    (' 5:30', 330),
+    # Anything but exactly one offset.
+    ('UTC+1 to +2', None),
+    ('UTC+1, UTC+2', None),
+    ('Europe/Paris', None),
+    ('', None),
+])
+def test_parse_utc_offset(value, offset):
+    assert parse_utc_offset(value) == offset
+
+
+@pytest.mark.parametrize('minutes, label', [
+    (0, 'UTC'), (60, 'UTC+1'), (-210, 'UTC-3:30'), (345, 'UTC+5:45'),
+])
+def test_offset_label(minutes, label):
+    assert offset_label(minutes) == label
@@ -0,0 +1,96 @@
+from data_operations.db_seed import import_data
+from data_operations.pipeline import select_changed_countries
+from scrapers.revision_scraper import (
+    API_URL, MAX_TITLES_PER_REQUEST, fetch_revisions
+)
+
+WIKI = 'https://en.wikipedia.org/wiki/'
+
+
+class StubResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class StubClient:
+    """Answers revision queries from ``revisions`` (title -> revid).
+
+    ``redirects`` maps a requested title to the page it redirects to.
+    Every call is recorded in ``calls``.
+    """
+
+    def __init__(self, revisions, redirects=None):
+        self.revisions = revisions
+        self.redirects = redirects or {}
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, params))
+        titles = params['titles'].split('|')
+        redirects = [{'from': t, 'to': self.redirects[t]}
+                     for t in titles if t in self.redirects]
+        pages = [
+            {'title': title, 'revisions': [{'revid': self.revisions[title]}]}
+            if title in self.revisions else {'title': title, 'missing': True}
+            for title in (self.redirects.get(t, t) for t in titles)
+        ]
+        return StubResponse({'query': {'redirects': redirects,
+                                       'pages': pages}})
+
+
+def test_revisions_are_fetched_fifty_titles_per_request():
+    links = [f'{WIKI}Country_{i}' for i in range(120)]
+    client = StubClient({f'Country {i}': 1000 + i for i in range(120)})
+
+    revisions = fetch_revisions(links, client)
+
+    assert revisions == {link: 1000 + i for i, link in enumerate(links)}
+    assert len(client.calls) == 3
+    assert all(url == API_URL for url, _ in client.calls)
+    assert [len(params['titles'].split('|')) for _, params in client.calls] \
+        == [MAX_TITLES_PER_REQUEST, MAX_TITLES_PER_REQUEST, 20]
+
+
+def test_redirected_titles_map_back_to_their_link():
+    client = StubClient({'Czech Republic': 7},
+                        redirects={'Czechia': 'Czech Republic'})
+
+    assert fetch_revisions([f'{WIKI}Czechia'], client) == {
+        f'{WIKI}Czechia': 7}
+
+
+def test_only_changed_countries_are_selected(tmp_path):
+    db_path = str(tmp_path / 'countries.db')
+    stored = {'Aland': (11, 100), 'Borduria': (21, 200),
+              'Carpania': (31, 300), 'Elbonia': (51, 500)}
+    import_data([
+        {'name': name, 'population': population, 'revision_id': revision_id,
+         'additional_info': {'Area': '1', 'Density': '1'}}
+        for name, (revision_id, population) in stored.items()
+    ], db_path)
+
+    countries = [
+        {'name': name, 'population': population,
+         'country_link': f'{WIKI}{name}'}
+        for name, population in [
+            ('Aland', '100'),      # unchanged
+            ('Borduria', '200'),   # article edited
+            ('Carpania', '301'),   # population changed
+            ('Dacia', '400'),      # not stored yet
+            ('Elbonia', '500'),    # revision unknown
+        ]
+    ]
+    client = StubClient({'Aland': 11, 'Borduria': 22, 'Carpania': 31,
+                         'Dacia': 41})
+
+    changed = select_changed_countries(countries, db_path, client)
+
+    assert [(c['name'], c['revision_id']) for c in changed] == [
+        ('Borduria', 22), ('Carpania', 31), ('Dacia', 41), ('Elbonia', None)]
+    assert len(client.calls) == 1